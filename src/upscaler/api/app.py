@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import shutil
+import os
 import time
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -15,6 +15,7 @@ from fastapi.staticfiles import StaticFiles
 
 from upscaler.core.config import settings
 from upscaler.api.dependencies import init_dependencies, cleanup_dependencies, get_progress
+from upscaler.api.image_index import clear_index, forget_paths
 from upscaler.api.websocket import (
     router as ws_router,
     broadcast_worker,
@@ -25,20 +26,48 @@ from upscaler.api.routes import models, upscale, compare, images, settings as se
 logger = logging.getLogger(__name__)
 
 
-async def _temp_cleanup_loop():
-    """Periodically clean up old temp files."""
-    while True:
-        await asyncio.sleep(300)  # Check every 5 minutes
-        temp_dir = settings.temp_path
-        if not temp_dir.exists():
-            continue
-        cutoff = time.time() - (settings.temp_max_age_minutes * 60)
-        for f in temp_dir.iterdir():
-            if f.is_file() and f.stat().st_mtime < cutoff:
+# Unlink relative to an open directory fd where supported (not on Windows)
+_UNLINK_DIR_FD = os.unlink in os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
+
+
+def _purge_temp_files(temp_dir: Path, cutoff: float | None = None) -> list[Path]:
+    """Delete top-level temp files (older than cutoff, if given). Returns deleted paths."""
+    removed: list[Path] = []
+    try:
+        dir_fd = os.open(temp_dir, os.O_RDONLY | os.O_DIRECTORY) if _UNLINK_DIR_FD else None
+    except FileNotFoundError:
+        return removed
+    try:
+        with os.scandir(temp_dir) as it:
+            for entry in it:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
                 try:
-                    f.unlink()
+                    if cutoff is None or entry.stat().st_mtime < cutoff:
+                        if dir_fd is not None:
+                            os.unlink(entry.name, dir_fd=dir_fd)
+                        else:
+                            os.unlink(entry.path)
+                        removed.append(Path(entry.path))
                 except OSError:
                     pass
+    except FileNotFoundError:
+        pass
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+    return removed
+
+
+async def _temp_cleanup_loop():
+    """Periodically clean up old temp files and stale job records."""
+    while True:
+        await asyncio.sleep(300)  # Check every 5 minutes
+        max_age = settings.temp_max_age_minutes * 60
+        forget_paths(_purge_temp_files(settings.temp_path, time.time() - max_age))
+        # Job/comparison records outlive their result files by no more than one sweep
+        upscale.prune_jobs(max_age)
+        compare.prune_comparisons(max_age)
 
 
 @asynccontextmanager
@@ -66,14 +95,8 @@ async def lifespan(app: FastAPI):
     cleanup_dependencies()
 
     # Clean temp dir
-    temp_dir = settings.temp_path
-    if temp_dir.exists():
-        for f in temp_dir.iterdir():
-            if f.is_file():
-                try:
-                    f.unlink()
-                except OSError:
-                    pass
+    clear_index()
+    _purge_temp_files(settings.temp_path)
 
 
 def create_app() -> FastAPI:
@@ -2,33 +2,57 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, TypeVar
+
 from upscaler.core.config import settings
 from upscaler.core.model_manager import ModelManager
 from upscaler.core.upscale_engine import UpscaleEngine
 from upscaler.core.comparison import ComparisonRunner
 from upscaler.core.progress import ProgressReporter
 
+T = TypeVar("T")
+
 # Singletons initialized at app startup
 progress_reporter: ProgressReporter | None = None
 model_manager: ModelManager | None = None
 upscale_engine: UpscaleEngine | None = None
 comparison_runner: ComparisonRunner | None = None
+# Dedicated worker for model inference, so GPU jobs run one at a time and
+# don't compete with the default threadpool used for file I/O
+gpu_executor: ThreadPoolExecutor | None = None
+# Image encoding (PNG/WebP compression) runs here so it doesn't hold up the GPU worker
+encode_executor: ThreadPoolExecutor | None = None
+
+# Strong references to fire-and-forget tasks so they aren't garbage-collected mid-run
+_background_tasks: set[asyncio.Task] = set()
 
 
 def init_dependencies() -> None:
     """Initialize all shared singletons. Called during app lifespan startup."""
     global progress_reporter, model_manager, upscale_engine, comparison_runner
+    global gpu_executor, encode_executor
 
     progress_reporter = ProgressReporter()
     model_manager = ModelManager(progress=progress_reporter)
     model_manager.scan()
     upscale_engine = UpscaleEngine(model_manager=model_manager, progress=progress_reporter)
     comparison_runner = ComparisonRunner(model_manager=model_manager, progress=progress_reporter)
+    gpu_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upscale-gpu")
+    encode_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="upscale-encode")
 
 
 def cleanup_dependencies() -> None:
     """Cleanup on shutdown."""
-    global model_manager
+    global model_manager, gpu_executor, encode_executor
+    if gpu_executor:
+        gpu_executor.shutdown(wait=False, cancel_futures=True)
+        gpu_executor = None
+    if encode_executor:
+        encode_executor.shutdown(wait=False, cancel_futures=True)
+        encode_executor = None
     if model_manager:
         model_manager.unload_all()
 
@@ -48,6 +72,26 @@ def get_comparison_runner() -> ComparisonRunner:
     return comparison_runner
 
 
+def get_encode_executor() -> ThreadPoolExecutor:
+    assert encode_executor is not None, "Dependencies not initialized"
+    return encode_executor
+
+
 def get_progress() -> ProgressReporter:
     assert progress_reporter is not None, "Dependencies not initialized"
     return progress_reporter
+
+
+async def run_on_gpu(fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run a blocking inference call on the dedicated GPU worker thread."""
+    assert gpu_executor is not None, "Dependencies not initialized"
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(gpu_executor, functools.partial(fn, *args, **kwargs))
+
+
+def run_in_background(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """Schedule a coroutine that outlives the request, keeping a reference until it finishes."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
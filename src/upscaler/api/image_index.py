@@ -0,0 +1,37 @@
+"""In-memory index of servable images: image_id → (file path, media type) in the temp dir."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable
+
+from upscaler.core.media import EXT_TO_MEDIA
+
+# Populated by the routes that write into the temp dir
+_image_index: dict[str, tuple[Path, str]] = {}
+
+
+def register_image(image_id: str, path: Path) -> None:
+    """Record the file that should be served for an image_id.
+
+    The media type is resolved here, once, so serving is a single dict read.
+    """
+    media_type = EXT_TO_MEDIA.get(path.suffix.lower(), "application/octet-stream")
+    _image_index[image_id] = (path, media_type)
+
+
+def lookup_image(image_id: str) -> tuple[Path, str] | None:
+    return _image_index.get(image_id)
+
+
+def forget_paths(paths: Iterable[Path]) -> None:
+    """Drop index entries pointing at files that have been deleted."""
+    gone = set(paths)
+    if not gone:
+        return
+    for image_id in [k for k, (p, _) in _image_index.items() if p in gone]:
+        del _image_index[image_id]
+
+
+def clear_index() -> None:
+    _image_index.clear()
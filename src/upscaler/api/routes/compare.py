@@ -2,20 +2,29 @@
 
 from __future__ import annotations
 
-import asyncio
-import uuid
+import logging
+import secrets
 from pathlib import Path
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 
-from upscaler.api.dependencies import get_comparison_runner, get_progress
+from upscaler.api.dependencies import get_comparison_runner, get_progress, run_in_background, run_on_gpu
+from upscaler.api.image_index import register_image
+from upscaler.api.uploads import save_upload
 from upscaler.api.schemas import ComparisonResponse, ComparisonResultSchema
+from upscaler.api.store import BoundedStore
 from upscaler.core.config import settings
 
+logger = logging.getLogger(__name__)
 router = APIRouter(tags=["compare"])
 
 # In-memory comparison results
-_comparisons: dict[str, ComparisonResponse] = {}
+_comparisons: BoundedStore[ComparisonResponse] = BoundedStore()
+
+
+def prune_comparisons(max_age_seconds: float) -> int:
+    """Drop comparison records older than max_age_seconds."""
+    return _comparisons.prune(max_age_seconds)
 
 
 @router.post("/compare")
@@ -36,33 +45,29 @@ async def compare_models(
 
     # Save upload
     temp_dir = settings.temp_path
-    temp_dir.mkdir(parents=True, exist_ok=True)
-    comparison_id = uuid.uuid4().hex[:12]
+    comparison_id = secrets.token_hex(6)
     input_path = temp_dir / f"compare_{comparison_id}_{file.filename}"
 
-    with open(input_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    await save_upload(file, input_path)
 
-    # Save a copy as the "original" for the comparison view
+    # Serve the uploaded file itself as the "original" for the comparison view
     original_id = f"original_{comparison_id}"
-    import shutil
-    original_copy = temp_dir / f"{original_id}{input_path.suffix}"
-    shutil.copy2(input_path, original_copy)
+    register_image(original_id, input_path)
 
     # Output dir for this comparison
     output_dir = temp_dir / f"compare_{comparison_id}"
     output_dir.mkdir(exist_ok=True)
 
-    _comparisons[comparison_id] = ComparisonResponse(
+    comparison = ComparisonResponse(
         comparison_id=comparison_id,
         input_image_id=original_id,
         scale=scale,
     )
+    _comparisons[comparison_id] = comparison
 
     async def run_comparison():
         try:
-            result = await asyncio.to_thread(
+            result = await run_on_gpu(
                 runner.compare,
                 input_path=input_path,
                 model_ids=models_list,
@@ -77,9 +82,10 @@ async def compare_models(
                 # Use actual output filename stem as image_id so serving works
                 if r.output_path:
                     image_id = Path(r.output_path).stem
+                    register_image(image_id, Path(r.output_path))
                 else:
                     image_id = f"compare_{comparison_id}_{r.model_id}"
-                _comparisons[comparison_id].results.append(
+                comparison.results.append(
                     ComparisonResultSchema(
                         model_id=r.model_id,
                         image_id=image_id,
@@ -89,7 +95,8 @@ async def compare_models(
                     )
                 )
         except Exception as e:
-            _comparisons[comparison_id].results.append(
+            logger.exception("Comparison %s failed", comparison_id)
+            comparison.results.append(
                 ComparisonResultSchema(
                     model_id="error",
                     image_id="",
@@ -99,13 +106,14 @@ async def compare_models(
                 )
             )
 
-    asyncio.create_task(run_comparison())
+    run_in_background(run_comparison())
     return {"comparison_id": comparison_id, "input_image_id": original_id}
 
 
 @router.get("/compare/{comparison_id}")
 async def get_comparison(comparison_id: str) -> ComparisonResponse:
     """Get comparison results (may be partial if still running)."""
-    if comparison_id not in _comparisons:
+    comparison = _comparisons.get(comparison_id)
+    if comparison is None:
         raise HTTPException(status_code=404, detail="Comparison not found")
-    return _comparisons[comparison_id]
+    return comparison
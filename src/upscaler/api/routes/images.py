@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
 
+from upscaler.api.image_index import forget_paths, lookup_image, register_image
 from upscaler.core.config import settings
 
 router = APIRouter(tags=["images"])
@@ -15,24 +17,41 @@ router = APIRouter(tags=["images"])
 @router.get("/images/{image_id}")
 async def get_image(image_id: str):
     """Serve a result image from the temp directory."""
-    temp_dir = settings.temp_path
-
-    # Search temp dir (and subdirs) for a file matching the image_id
-    for path in temp_dir.rglob("*"):
-        if path.is_file() and (path.stem.startswith(image_id) or image_id in path.stem):
-            media_type = _guess_media_type(path.suffix)
-            return FileResponse(str(path), media_type=media_type)
-
-    raise HTTPException(status_code=404, detail=f"Image not found: {image_id}")
-
-
-def _guess_media_type(ext: str) -> str:
-    return {
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".webp": "image/webp",
-        ".bmp": "image/bmp",
-        ".tiff": "image/tiff",
-        ".tif": "image/tiff",
-    }.get(ext.lower(), "application/octet-stream")
+    entry = lookup_image(image_id)
+    if entry is None:
+        found = _scan_temp_dir(settings.temp_path, image_id)
+        if found is None:
+            raise HTTPException(status_code=404, detail=f"Image not found: {image_id}")
+        register_image(image_id, found)
+        entry = lookup_image(image_id)
+    path, media_type = entry
+
+    # Stat once here and hand the result to FileResponse so it doesn't stat again;
+    # this also turns a stale index entry into a 404 instead of a 500 mid-response.
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        forget_paths([path])
+        raise HTTPException(status_code=404, detail=f"Image not found: {image_id}")
+
+    return FileResponse(str(path), media_type=media_type, stat_result=stat_result)
+
+
+def _scan_temp_dir(temp_dir: Path, image_id: str) -> Path | None:
+    """Fallback for unindexed images: depth-first scandir, stopping at the first match.
+
+    File/dir checks use the dirent type, so no per-entry stat is needed.
+    """
+    stack = [str(temp_dir)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if entry.name.rsplit(".", 1)[0].startswith(image_id):
+                            return Path(entry.path)
+        except FileNotFoundError:
+            continue
+    return None
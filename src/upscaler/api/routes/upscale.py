@@ -3,21 +3,39 @@
 from __future__ import annotations
 
 import asyncio
-import uuid
+import logging
+import secrets
 from pathlib import Path
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 from fastapi.responses import FileResponse
 
-from upscaler.api.dependencies import get_engine, get_model_manager, get_progress
+from upscaler.api.dependencies import (
+    get_encode_executor,
+    get_engine,
+    get_model_manager,
+    get_progress,
+    run_in_background,
+    run_on_gpu,
+)
+from upscaler.api.image_index import register_image
+from upscaler.api.uploads import save_upload
 from upscaler.api.schemas import JobStatusResponse
+from upscaler.api.store import BoundedStore
 from upscaler.core.config import settings
 from upscaler.core.batch import run_batch
+from upscaler.core.media import EXT_TO_MEDIA, FORMAT_TO_EXT
 
+logger = logging.getLogger(__name__)
 router = APIRouter(tags=["upscale"])
 
 # In-memory job tracking for batch operations
-_jobs: dict[str, JobStatusResponse] = {}
+_jobs: BoundedStore[JobStatusResponse] = BoundedStore()
+
+
+def prune_jobs(max_age_seconds: float) -> int:
+    """Drop job records older than max_age_seconds."""
+    return _jobs.prune(max_age_seconds)
 
 
 @router.post("/upscale")
@@ -34,20 +52,18 @@ async def upscale_image(
 
     # Save upload to temp
     temp_dir = settings.temp_path
-    temp_dir.mkdir(parents=True, exist_ok=True)
-    upload_id = uuid.uuid4().hex[:12]
+    upload_id = secrets.token_hex(6)
     input_path = temp_dir / f"upload_{upload_id}_{file.filename}"
 
-    with open(input_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    await save_upload(file, input_path)
 
     # Build output path in temp
-    fmt_ext = {"png": ".png", "jpg": ".jpg", "jpeg": ".jpg", "webp": ".webp"}.get(output_format.lower(), ".png")
+    fmt_ext = FORMAT_TO_EXT.get(output_format.lower(), ".png")
     output_path = temp_dir / f"result_{upload_id}_{scale}x_{model_id}{fmt_ext}"
 
     try:
-        result_path = await asyncio.to_thread(
+        # The GPU worker hands encoding off and moves on to the next request
+        saved = await run_on_gpu(
             engine.upscale,
             input_path=input_path,
             output_path=output_path,
@@ -56,18 +72,17 @@ async def upscale_image(
             output_format=output_format,
             tile_size=tile_size if tile_size > 0 else None,
             jpeg_quality=jpeg_quality if jpeg_quality > 0 else None,
+            save_executor=get_encode_executor(),
         )
+        result_path = await asyncio.wrap_future(saved)
     except KeyError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    media_type = {
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".webp": "image/webp",
-    }.get(fmt_ext, "image/png")
+    register_image(result_path.stem, result_path)
+
+    media_type = EXT_TO_MEDIA.get(fmt_ext, "image/png")
 
     return FileResponse(str(result_path), media_type=media_type, filename=result_path.name)
 
@@ -85,14 +100,15 @@ async def upscale_batch(
     """Start a batch upscaling job. Returns a job_id for tracking."""
     engine = get_engine()
     progress = get_progress()
-    job_id = uuid.uuid4().hex[:12]
+    job_id = secrets.token_hex(6)
 
-    _jobs[job_id] = JobStatusResponse(job_id=job_id, status="pending")
+    job = JobStatusResponse(job_id=job_id, status="pending")
+    _jobs[job_id] = job
 
     async def run_job():
-        _jobs[job_id].status = "running"
+        job.status = "running"
         try:
-            result = await asyncio.to_thread(
+            result = await run_on_gpu(
                 run_batch,
                 engine=engine,
                 input_dir=input_dir,
@@ -104,22 +120,24 @@ async def upscale_batch(
                 skip_existing=skip_existing,
                 progress=progress,
             )
-            _jobs[job_id].status = "completed"
-            _jobs[job_id].progress = 1.0
-            _jobs[job_id].results = [
+            job.status = "completed"
+            job.progress = 1.0
+            job.results = [
                 {"completed": result.completed, "skipped": result.skipped, "failed": result.failed}
             ]
         except Exception as e:
-            _jobs[job_id].status = "failed"
-            _jobs[job_id].error = str(e)
+            logger.exception("Batch job %s failed", job_id)
+            job.status = "failed"
+            job.error = str(e)
 
-    asyncio.create_task(run_job())
+    run_in_background(run_job())
     return {"job_id": job_id}
 
 
 @router.get("/jobs/{job_id}")
 async def get_job_status(job_id: str) -> JobStatusResponse:
     """Check status of a batch job."""
-    if job_id not in _jobs:
+    job = _jobs.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    return _jobs[job_id]
+    return job
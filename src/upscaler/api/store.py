@@ -0,0 +1,51 @@
+"""Bounded in-memory store for job and comparison state."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class BoundedStore(Generic[T]):
+    """LRU-ordered map capped at max_entries, with age-based pruning.
+
+    Entries are timestamped on insert; prune() drops anything older than the
+    given age regardless of how recently it was read.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._items: OrderedDict[str, tuple[float, T]] = OrderedDict()
+
+    def __setitem__(self, key: str, value: T) -> None:
+        if key in self._items:
+            del self._items[key]
+        while len(self._items) >= self.max_entries:
+            self._items.popitem(last=False)
+        self._items[key] = (time.monotonic(), value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str) -> T | None:
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        self._items.move_to_end(key)
+        return entry[1]
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Remove entries older than max_age_seconds. Returns how many were removed."""
+        cutoff = time.monotonic() - max_age_seconds
+        expired = [k for k, (created, _) in self._items.items() if created < cutoff]
+        for key in expired:
+            del self._items[key]
+        return len(expired)
@@ -0,0 +1,23 @@
+"""Helpers for persisting uploaded files to the temp directory."""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+from pathlib import Path
+
+from fastapi import UploadFile
+
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+def _copy_to_disk(src, dest: Path) -> None:
+    with open(dest, "wb") as f:
+        shutil.copyfileobj(src, f, length=UPLOAD_CHUNK_SIZE)
+
+
+async def save_upload(file: UploadFile, dest: Path) -> Path:
+    """Stream an upload to disk in fixed-size chunks without buffering it in memory."""
+    await file.seek(0)
+    await asyncio.to_thread(_copy_to_disk, file.file, dest)
+    return dest
@@ -9,11 +9,26 @@ from typing import Any
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from upscaler.core.progress import ProgressEvent
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+from upscaler.core.progress import EventType, ProgressEvent
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Event types where only the latest snapshot matters; bursts of these are coalesced
+_COALESCED_TYPES = {
+    EventType.TILE_PROGRESS.value,
+    EventType.BATCH_PROGRESS.value,
+    EventType.DOWNLOAD_PROGRESS.value,
+}
+
+# Upper bound on undelivered events; when full the oldest are dropped
+EVENT_QUEUE_MAXSIZE = 512
+
 # Connected WebSocket clients
 _clients: set[WebSocket] = set()
 _event_queue: asyncio.Queue[dict] | None = None
@@ -22,12 +37,14 @@ _event_queue: asyncio.Queue[dict] | None = None
 def get_event_queue() -> asyncio.Queue[dict]:
     global _event_queue
     if _event_queue is None:
-        _event_queue = asyncio.Queue()
+        _event_queue = asyncio.Queue(maxsize=EVENT_QUEUE_MAXSIZE)
     return _event_queue
 
 
 def progress_to_ws_callback(event: ProgressEvent) -> None:
     """Callback that pushes progress events to the async queue for WebSocket broadcast."""
+    if not _clients:
+        return  # Nobody listening; don't build or queue the payload
     queue = get_event_queue()
     data = {
         "type": event.event_type.value,
@@ -36,23 +53,61 @@ def progress_to_ws_callback(event: ProgressEvent) -> None:
     try:
         queue.put_nowait(data)
     except asyncio.QueueFull:
-        pass  # Drop if queue is full
+        # Fresh events matter more than stale ones: drop the oldest and retry
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        try:
+            queue.put_nowait(data)
+        except asyncio.QueueFull:
+            pass
+
+
+def _encode(events: list[dict]) -> bytes:
+    """Serialize events straight to UTF-8 bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(events)
+    return json.dumps(events).encode()
+
+
+def _coalesce(batch: list[dict]) -> list[dict]:
+    """Keep only the latest progress event per (type, model), preserving order otherwise."""
+    seen: set[tuple] = set()
+    kept: list[dict] = []
+    for data in reversed(batch):
+        if data["type"] in _COALESCED_TYPES:
+            key = (data["type"], data.get("model_id") or data.get("model_key"))
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(data)
+    kept.reverse()
+    return kept
 
 
 async def broadcast_worker() -> None:
-    """Background task that reads from queue and broadcasts to all WS clients."""
+    """Background task that drains the queue and broadcasts batches to all WS clients.
+
+    Each message is a binary frame holding a UTF-8 JSON array of events.
+    """
     queue = get_event_queue()
     while True:
-        data = await queue.get()
-        msg = json.dumps(data)
-        dead: list[WebSocket] = []
-        for ws in _clients:
+        batch = [await queue.get()]
+        while True:
             try:
-                await ws.send_text(msg)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            _clients.discard(ws)
+                batch.append(queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        msg = _encode(_coalesce(batch))
+        # Snapshot so clients can (dis)connect while sends are in flight
+        clients = list(_clients)
+        results = await asyncio.gather(
+            *(ws.send_bytes(msg) for ws in clients), return_exceptions=True
+        )
+        for ws, r in zip(clients, results):
+            if isinstance(r, Exception):
+                _clients.discard(ws)
 
 
 @router.websocket("/ws/progress")
@@ -61,9 +116,11 @@ async def ws_progress(websocket: WebSocket):
     await websocket.accept()
     _clients.add(websocket)
     try:
+        # Only wait for the disconnect; inbound frames (client pings) are not decoded
         while True:
-            # Keep connection alive; client can send pings
-            await websocket.receive_text()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
     except WebSocketDisconnect:
         pass
     finally:
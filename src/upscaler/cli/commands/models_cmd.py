@@ -1,5 +1,7 @@
 """CLI command: manage models — list, download, info."""
 
+import time
+
 import click
 from rich.console import Console
 from rich.table import Table
@@ -17,6 +19,8 @@ from upscaler.core.progress import EventType, ProgressEvent, ProgressReporter
 
 console = Console()
 
+PBAR_REFRESH_INTERVAL = 0.1  # seconds
+
 
 @click.group()
 def models():
@@ -30,32 +34,20 @@ def list_models(available):
     """List installed or available models."""
     if available:
         entries = list_available()
+        not_dl = frozenset(e.key for e in list_not_downloaded())
+
         table = Table(title="Available Models (Registry)")
         table.add_column("Key", style="cyan")
         table.add_column("Name")
         table.add_column("Arch", style="green")
         table.add_column("Scale", justify="right")
-
-        not_dl = {e.key for e in list_not_downloaded()}
-        for entry in entries:
-            status = "[red]not downloaded[/red]" if entry.key in not_dl else "[green]installed[/green]"
-            table.add_row(entry.key, entry.name, entry.architecture, f"{entry.scale}x", status)
-
-        # Add status column
         table.add_column("Status")
-        # Re-create with all columns
-        table2 = Table(title="Available Models (Registry)")
-        table2.add_column("Key", style="cyan")
-        table2.add_column("Name")
-        table2.add_column("Arch", style="green")
-        table2.add_column("Scale", justify="right")
-        table2.add_column("Status")
         for entry in entries:
             status = "not downloaded" if entry.key in not_dl else "installed"
             style = "red" if entry.key in not_dl else "green"
-            table2.add_row(entry.key, entry.name, entry.architecture, f"{entry.scale}x", f"[{style}]{status}[/{style}]")
+            table.add_row(entry.key, entry.name, entry.architecture, f"{entry.scale}x", f"[{style}]{status}[/{style}]")
 
-        console.print(table2)
+        console.print(table)
     else:
         manager = ModelManager()
         models_list = manager.scan()
@@ -83,9 +75,10 @@ def download(model_key, download_all):
     """Download a model from the registry."""
     progress = ProgressReporter()
     pbar = None
+    last_refresh = 0.0
 
     def on_progress(event: ProgressEvent):
-        nonlocal pbar
+        nonlocal pbar, last_refresh
         if event.event_type == EventType.DOWNLOAD_PROGRESS:
             total = event.data.get("total", 0)
             downloaded = event.data.get("downloaded", 0)
@@ -93,7 +86,11 @@ def download(model_key, download_all):
                 pbar = tqdm(total=total, unit="B", unit_scale=True, desc=event.data.get("model_key", ""))
             if pbar:
                 pbar.n = downloaded
-                pbar.refresh()
+                # Redraw at most ~10 times a second; always show the final state
+                now = time.monotonic()
+                if now - last_refresh >= PBAR_REFRESH_INTERVAL or downloaded >= total:
+                    pbar.refresh()
+                    last_refresh = now
 
     progress.add_callback(on_progress)
 
@@ -131,8 +128,11 @@ def download(model_key, download_all):
 def info(model_id):
     """Show detailed info about an installed model."""
     manager = ModelManager()
-    manager.scan()
-    model_info = manager.get_model_info(model_id)
+    model_info = manager.find_model_info(model_id)
+    if not model_info:
+        # Filename doesn't match the id directly (e.g. upper-case extension)
+        manager.scan()
+        model_info = manager.get_model_info(model_id)
 
     if not model_info:
         click.echo(f"Model not found: {model_id}", err=True)
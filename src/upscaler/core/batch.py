@@ -3,13 +3,19 @@
 from __future__ import annotations
 
 import logging
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
+from operator import attrgetter
 from pathlib import Path
 
+import torch
+
 from upscaler.core.config import settings
-from upscaler.core.image_io import SUPPORTED_EXTENSIONS
+from upscaler.core.image_io import SUPPORTED_EXTENSIONS, load_image_as_tensor
 from upscaler.core.progress import EventType, ProgressReporter
-from upscaler.core.upscale_engine import UpscaleEngine
+from upscaler.core.upscale_engine import UpscaleEngine, _format_to_ext
 
 logger = logging.getLogger(__name__)
 
@@ -24,14 +30,33 @@ class BatchResult:
     errors: list[str] = field(default_factory=list)
 
 
+_EXT_TUPLE = tuple(SUPPORTED_EXTENSIONS)
+
+# Decode/encode threads per stage, and how many images are decoded ahead of the GPU
+IO_WORKERS = 2
+PREFETCH_DEPTH = 4
+
+
 def find_images(input_dir: Path, recursive: bool = False) -> list[Path]:
-    """Find all supported image files in a directory."""
-    pattern = "**/*" if recursive else "*"
-    files = []
-    for path in input_dir.glob(pattern):
-        if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS:
-            files.append(path)
-    return sorted(files)
+    """Find all supported image files in a directory.
+
+    Each directory's entries are sorted by name and walked depth-first, which
+    yields the same order as sorting the full path list without comparing
+    N Path objects at the end.
+    """
+    files: list[Path] = []
+
+    def walk(directory: str) -> None:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=attrgetter("name"))
+        for entry in entries:
+            if recursive and entry.is_dir(follow_symlinks=False):
+                walk(entry.path)
+            elif entry.name.lower().endswith(_EXT_TUPLE) and entry.is_file():
+                files.append(Path(entry.path))
+
+    walk(str(input_dir))
+    return files
 
 
 def run_batch(
@@ -57,47 +82,103 @@ def run_batch(
     images = find_images(input_dir, recursive=recursive)
     result = BatchResult(total=len(images))
 
-    for i, img_path in enumerate(images):
+    # Resolve outputs up front so skipped files are never decoded
+    jobs: list[tuple[Path, Path]] = []
+    suffix = f"_{scale}x_{model_id or 'upscaled'}{_format_to_ext(output_format)}"
+    for img_path in images:
         # Build output path preserving subdirectory structure
         rel = img_path.relative_to(input_dir)
-        from upscaler.core.upscale_engine import _format_to_ext
-        ext = _format_to_ext(output_format)
-        model_name = model_id or "upscaled"
-        out_name = f"{img_path.stem}_{scale}x_{model_name}{ext}"
-        out_path = output_dir / rel.parent / out_name
+        out_path = output_dir.joinpath(rel.parent, img_path.stem + suffix)
 
         if skip_existing and out_path.exists():
             result.skipped += 1
             logger.info("Skipping (exists): %s", out_path)
             continue
+        jobs.append((img_path, out_path))
+
+    def record_failure(img_path: Path, e: Exception) -> None:
+        result.failed += 1
+        result.errors.append(f"{img_path}: {e}")
+        logger.error("Failed to process %s: %s", img_path, e)
+        progress.emit(
+            EventType.IMAGE_ERROR,
+            path=str(img_path),
+            error=str(e),
+        )
+
+    def report(img_path: Path) -> None:
+        progress.emit(
+            EventType.BATCH_PROGRESS,
+            completed=result.completed + result.skipped + result.failed,
+            total=result.total,
+            current_file=img_path.name,
+        )
 
+    def finish_save(img_path: Path, out_path: Path, future: Future) -> None:
         try:
-            engine.upscale(
+            future.result()
+            result.completed += 1
+            result.outputs.append(str(out_path))
+        except Exception as e:
+            record_failure(img_path, e)
+        report(img_path)
+
+    # Three-stage pipeline: loader threads decode ahead of the GPU, the calling
+    # thread runs inference, and encoder threads write results behind it. Both
+    # windows are bounded so memory stays flat; saves are finished in submission
+    # order so result.outputs keeps input order.
+    with (
+        ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="batch-load") as loader,
+        ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="batch-save") as saver,
+    ):
+        loads: deque[Future] = deque(
+            loader.submit(_load_for_batch, img_path) for img_path, _ in jobs[:PREFETCH_DEPTH]
+        )
+        saves: deque[tuple[Path, Path, Future]] = deque()
+
+        for i, (img_path, out_path) in enumerate(jobs):
+            load = loads.popleft()
+            if i + PREFETCH_DEPTH < len(jobs):
+                loads.append(loader.submit(_load_for_batch, jobs[i + PREFETCH_DEPTH][0]))
+
+            try:
+                output = engine.upscale_tensor(
+                    load.result(),
+                    model_id=model_id,
+                    scale=scale,
+                    tile_size=tile_size,
+                )
+            except Exception as e:
+                # Flush earlier saves first so failures are reported in order
+                while saves:
+                    finish_save(*saves.popleft())
+                record_failure(img_path, e)
+                report(img_path)
+                continue
+
+            while len(saves) >= IO_WORKERS:
+                finish_save(*saves.popleft())
+            future = saver.submit(
+                engine.save_result,
+                output,
                 input_path=img_path,
                 output_path=out_path,
                 model_id=model_id,
                 scale=scale,
                 output_format=output_format,
-                tile_size=tile_size,
                 jpeg_quality=jpeg_quality,
             )
-            result.completed += 1
-            result.outputs.append(str(out_path))
-        except Exception as e:
-            result.failed += 1
-            result.errors.append(f"{img_path}: {e}")
-            logger.error("Failed to process %s: %s", img_path, e)
-            progress.emit(
-                EventType.IMAGE_ERROR,
-                path=str(img_path),
-                error=str(e),
-            )
+            saves.append((img_path, out_path, future))
 
-        progress.emit(
-            EventType.BATCH_PROGRESS,
-            completed=result.completed + result.skipped + result.failed,
-            total=result.total,
-            current_file=img_path.name,
-        )
+        while saves:
+            finish_save(*saves.popleft())
 
     return result
+
+
+def _load_for_batch(path: Path) -> torch.Tensor:
+    """Decode on CPU, pinning the result so the host-to-device copy can be async."""
+    tensor = load_image_as_tensor(path, device="cpu")
+    if torch.cuda.is_available():
+        tensor = tensor.pin_memory()
+    return tensor
@@ -0,0 +1,130 @@
+"""Eviction policies for the loaded-model cache in ModelManager."""
+
+from __future__ import annotations
+
+from abc import abstractmethod
+from collections import OrderedDict, deque
+from typing import Any, Container, Iterator, MutableMapping
+
+
+class GPUCachePolicy(MutableMapping[str, Any]):
+    """A model_id → loaded model mapping that decides which entry to evict.
+
+    ``touch`` records a cache hit; ``evict_victim`` removes and returns the entry
+    the policy would drop next, passing over keys in ``pinned``, or returns None
+    when every entry is pinned.
+    """
+
+    @abstractmethod
+    def touch(self, key: str) -> None: ...
+
+    @abstractmethod
+    def evict_victim(self, pinned: Container[str] = ()) -> tuple[str, Any] | None: ...
+
+
+def _first_unpinned(queue: OrderedDict[str, Any], pinned: Container[str]) -> str | None:
+    return next((key for key in queue if key not in pinned), None)
+
+
+class LRUPolicy(GPUCachePolicy):
+    """Plain least-recently-used eviction."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+
+    def __getitem__(self, key: str) -> Any:
+        return self._entries[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+    def __delitem__(self, key: str) -> None:
+        del self._entries[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def touch(self, key: str) -> None:
+        self._entries.move_to_end(key)
+
+    def evict_victim(self, pinned: Container[str] = ()) -> tuple[str, Any] | None:
+        key = _first_unpinned(self._entries, pinned)
+        if key is None:
+            return None
+        return key, self._entries.pop(key)
+
+
+class TwoQueuePolicy(GPUCachePolicy):
+    """2Q eviction: models must be used twice before they are protected.
+
+    New models enter a FIFO probation queue (A1in) and are evicted from there
+    first, so a burst of one-off loads (e.g. a many-model comparison) can't push
+    out a model most jobs share. A hit while on probation promotes the model to
+    the LRU main queue (Am). Recently evicted probation ids are remembered
+    (A1out), so a model that comes back soon goes straight to Am.
+    """
+
+    def __init__(self, ghost_size: int = 8) -> None:
+        self._a1_in: OrderedDict[str, Any] = OrderedDict()
+        self._am: OrderedDict[str, Any] = OrderedDict()
+        self._a1_out: deque[str] = deque(maxlen=ghost_size)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._am:
+            return self._am[key]
+        return self._a1_in[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._am:
+            self._am[key] = value
+            self._am.move_to_end(key)
+        elif key in self._a1_in:
+            self._a1_in[key] = value
+        elif key in self._a1_out:
+            self._a1_out.remove(key)
+            self._am[key] = value
+        else:
+            self._a1_in[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._am:
+            del self._am[key]
+        else:
+            del self._a1_in[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._a1_in
+        yield from self._am
+
+    def __len__(self) -> int:
+        return len(self._a1_in) + len(self._am)
+
+    def touch(self, key: str) -> None:
+        if key in self._a1_in:
+            self._am[key] = self._a1_in.pop(key)
+        else:
+            self._am.move_to_end(key)
+
+    def evict_victim(self, pinned: Container[str] = ()) -> tuple[str, Any] | None:
+        key = _first_unpinned(self._a1_in, pinned)
+        if key is not None:
+            self._a1_out.append(key)
+            return key, self._a1_in.pop(key)
+        key = _first_unpinned(self._am, pinned)
+        if key is None:
+            return None
+        return key, self._am.pop(key)
+
+    def clear(self) -> None:
+        self._a1_in.clear()
+        self._am.clear()
+
+
+CACHE_POLICIES: dict[str, type[GPUCachePolicy]] = {
+    "lru": LRUPolicy,
+    "2q": TwoQueuePolicy,
+}
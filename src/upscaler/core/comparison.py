@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
@@ -13,7 +14,13 @@ from upscaler.core.image_io import load_image_as_tensor, save_tensor_as_image
 from upscaler.core.model_manager import ModelManager
 from upscaler.core.progress import EventType, ProgressReporter
 from upscaler.core.tiling import process_tiles
-from upscaler.core.upscale_engine import _compute_passes, _lanczos_resize, _format_to_ext
+from upscaler.core.upscale_engine import (
+    _compute_passes,
+    _format_to_ext,
+    _lanczos_resize,
+    configure_backends,
+    inference_autocast,
+)
 
 import torch
 
@@ -46,6 +53,7 @@ class ComparisonRunner:
     ) -> None:
         self.model_manager = model_manager
         self.progress = progress or ProgressReporter()
+        configure_backends()
 
     def compare(
         self,
@@ -71,96 +79,152 @@ class ComparisonRunner:
 
         result = ComparisonResult(input_path=str(input_path), scale=scale)
 
-        for model_id in model_ids:
-            self.progress.emit(EventType.COMPARISON_MODEL_START, model_id=model_id)
-            start = time.perf_counter()
-
-            try:
-                output_path = self._upscale_single(
-                    input_path, model_id, scale, output_dir,
-                    output_format, tile_size, tile_overlap, jpeg_quality,
-                )
-                duration = time.perf_counter() - start
-                result.results.append(ModelResult(
-                    model_id=model_id,
-                    output_path=str(output_path),
-                    duration_seconds=round(duration, 2),
-                ))
-            except Exception as e:
-                duration = time.perf_counter() - start
-                logger.error("Model %s failed: %s", model_id, e)
-                result.results.append(ModelResult(
-                    model_id=model_id,
-                    output_path="",
-                    duration_seconds=round(duration, 2),
-                    success=False,
-                    error=str(e),
-                ))
+        # Decode once, on the CPU (pinned for fast uploads). _upscale_single copies
+        # it to each model's device on first use and keeps that copy resident,
+        # so only the models are swapped between iterations.
+        try:
+            source = load_image_as_tensor(input_path)
+            if torch.cuda.is_available():
+                source = source.pin_memory()
+        except Exception as e:
+            # Nothing to compare: every requested model fails with the decode error
+            for model_id in model_ids:
+                self.progress.emit(EventType.COMPARISON_MODEL_START, model_id=model_id)
+                self._record(result, model_id, time.perf_counter(), error=e)
+            return result
+        inputs = {source.device: source}
+        ext = _format_to_ext(output_format)
 
-            self.progress.emit(
-                EventType.COMPARISON_MODEL_DONE,
-                model_id=model_id,
-                success=result.results[-1].success,
-            )
+        # Encoding model N overlaps loading/running model N+1. At most one save is
+        # in flight so only one extra output tensor is held in memory.
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="compare-save") as saver:
+            pending: Future | None = None
+            for model_id in model_ids:
+                self.progress.emit(EventType.COMPARISON_MODEL_START, model_id=model_id)
+                start = time.perf_counter()
+
+                output = error = None
+                try:
+                    output = self._upscale_single(
+                        inputs, model_id, scale, tile_size, tile_overlap,
+                    )
+                except Exception as e:
+                    error = e
+
+                # Unload model to free VRAM for next
+                self.model_manager.unload_model(model_id)
+
+                # Wait for the previous save so results stay in model order
+                if pending is not None:
+                    pending.result()
+                    pending = None
+                if error is not None:
+                    self._record(result, model_id, start, error=error)
+                else:
+                    out_path = output_dir / f"{input_path.stem}_{scale}x_{model_id}{ext}"
+                    pending = saver.submit(
+                        self._save, result, model_id, start, output, out_path,
+                        output_format, jpeg_quality,
+                    )
 
-            # Unload model to free VRAM for next
-            self.model_manager.unload_model(model_id)
+            if pending is not None:
+                pending.result()
 
         return result
 
-    def _upscale_single(
+    def _save(
         self,
-        input_path: Path,
+        result: ComparisonResult,
         model_id: str,
-        scale: int,
-        output_dir: Path,
+        start: float,
+        output: torch.Tensor,
+        out_path: Path,
         output_format: str,
-        tile_size: int,
-        tile_overlap: int,
         jpeg_quality: int,
-        _fp32_retry: bool = False,
-    ) -> Path:
-        """Upscale a single image with one model."""
-        model = self.model_manager.get_model(model_id)
-        model_scale = model.scale
-        device = next(model.model.parameters()).device
-        use_fp16 = settings.fp16 and device.type == "cuda" and not _fp32_retry
+    ) -> None:
+        try:
+            save_tensor_as_image(output, out_path, format=output_format, jpeg_quality=jpeg_quality)
+        except Exception as e:
+            self._record(result, model_id, start, error=e)
+        else:
+            self._record(result, model_id, start, output_path=out_path)
+
+    def _record(
+        self,
+        result: ComparisonResult,
+        model_id: str,
+        start: float,
+        output_path: Path | None = None,
+        error: Exception | None = None,
+    ) -> None:
+        """Append a model's result and announce it (only once its file is on disk)."""
+        duration = round(time.perf_counter() - start, 2)
+        if error is not None:
+            logger.error("Model %s failed: %s", model_id, error)
+            result.results.append(ModelResult(
+                model_id=model_id,
+                output_path="",
+                duration_seconds=duration,
+                success=False,
+                error=str(error),
+            ))
+        else:
+            result.results.append(ModelResult(
+                model_id=model_id,
+                output_path=str(output_path),
+                duration_seconds=duration,
+            ))
 
-        img_tensor = load_image_as_tensor(input_path, device=str(device))
-        if use_fp16:
-            img_tensor = img_tensor.half()
+        self.progress.emit(
+            EventType.COMPARISON_MODEL_DONE,
+            model_id=model_id,
+            success=error is None,
+        )
 
-        passes_needed = _compute_passes(scale, model_scale)
-        current = img_tensor
+    def _upscale_single(
+        self,
+        inputs: dict[torch.device, torch.Tensor],
+        model_id: str,
+        scale: int,
+        tile_size: int,
+        tile_overlap: int,
+    ) -> torch.Tensor:
+        """Upscale the resident input with one model; the result stays on the model's device.
+
+        ``inputs`` maps device to the input tensor, starting with the decoded CPU
+        copy; the copy for a model's device is made on first use and shared by
+        every later model on that device.
+        """
+        def tile_progress(done: int, total: int) -> None:
+            self.progress.emit(
+                EventType.TILE_PROGRESS,
+                model_id=model_id,
+                tiles_done=done,
+                tiles_total=total,
+            )
 
+        # Pinned so a concurrent load (e.g. from the API) can't evict it between passes
+        self.model_manager.pin(model_id)
         try:
-            for pass_idx in range(passes_needed):
-                def process_fn(tile: torch.Tensor, _model=model) -> torch.Tensor:
-                    return _model(tile)
-
-                def tile_progress(done: int, total: int) -> None:
-                    self.progress.emit(
-                        EventType.TILE_PROGRESS,
-                        model_id=model_id,
-                        tiles_done=done,
-                        tiles_total=total,
+            model = self.model_manager.get_model(model_id)
+            model_scale = model.scale
+            device = next(model.model.parameters()).device
+
+            img_tensor = inputs.get(device)
+            if img_tensor is None:
+                img_tensor = inputs[device] = next(iter(inputs.values())).to(device, non_blocking=True)
+
+            passes_needed = _compute_passes(scale, model_scale)
+            current = img_tensor
+
+            with inference_autocast(device):
+                for _ in range(passes_needed):
+                    current = process_tiles(
+                        current, model, model_scale, tile_size, tile_overlap, tile_progress,
+                        batch_size=settings.tile_batch_size or None,
                     )
-
-                current = process_tiles(
-                    current, process_fn, model_scale, tile_size, tile_overlap, tile_progress,
-                )
-        except RuntimeError as e:
-            err_msg = str(e).lower()
-            is_dtype_error = "expected scalar type" in err_msg or "half" in err_msg or "float" in err_msg
-            if is_dtype_error and not _fp32_retry:
-                # fp16 incompatible — reload in fp32 and retry
-                self.model_manager.reload_model_fp32(model_id)
-                return self._upscale_single(
-                    input_path, model_id, scale, output_dir,
-                    output_format, tile_size, tile_overlap, jpeg_quality,
-                    _fp32_retry=True,
-                )
-            raise
+        finally:
+            self.model_manager.unpin(model_id)
 
         achieved_scale = model_scale ** passes_needed
         if achieved_scale != scale:
@@ -168,12 +232,4 @@ class ComparisonRunner:
             target_h, target_w = oh * scale, ow * scale
             current = _lanczos_resize(current, target_w, target_h)
 
-        if current.dtype == torch.float16:
-            current = current.float()
-
-        ext = _format_to_ext(output_format)
-        out_name = f"{input_path.stem}_{scale}x_{model_id}{ext}"
-        out_path = output_dir / out_name
-
-        save_tensor_as_image(current, out_path, format=output_format, jpeg_quality=jpeg_quality)
-        return out_path
+        return current
@@ -2,16 +2,25 @@
 
 from __future__ import annotations
 
+import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 import yaml
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
 
+@lru_cache(maxsize=1)
 def _find_project_root() -> Path:
-    """Walk up from CWD looking for pyproject.toml, fall back to CWD."""
+    """Use UPSCALER_PROJECT_ROOT if set, else walk up from CWD looking for pyproject.toml.
+
+    Falls back to CWD.
+    """
+    env_root = os.environ.get("UPSCALER_PROJECT_ROOT")
+    if env_root:
+        return Path(env_root)
     current = Path.cwd()
     for parent in [current, *current.parents]:
         if (parent / "pyproject.toml").exists():
@@ -22,6 +31,7 @@ def _find_project_root() -> Path:
 PROJECT_ROOT = _find_project_root()
 
 
+@lru_cache(maxsize=1)
 def _load_yaml_config() -> dict:
     """Load config.yaml with fallback to config.default.yaml."""
     user_config = PROJECT_ROOT / "config.yaml"
@@ -52,10 +62,18 @@ class Settings(BaseSettings):
     # Tiling
     tile_size: int = 512
     tile_overlap: int = 32
+    tile_batch_size: int = 0  # tiles per forward pass; 0 = auto from tile size
 
     # Performance
     fp16: bool = True
+    # Half dtype fp16 runs in. bfloat16 avoids fp16 overflow in some models, but its
+    # 8-bit mantissa steps ~1/128 near 1.0, coarser than 8-bit output (banding).
+    half_dtype: Literal["float16", "bfloat16"] = "float16"
+    cudnn_benchmark: bool = True  # autotune conv kernels per tile shape (cached after first tile)
+    allow_tf32: bool = True  # TF32 matmul/conv for fp32 models on Ampere+
     max_loaded_models: int = 3
+    memory_free_threshold: float = 0.0  # evict models while free VRAM is below this fraction
+    model_cache_policy: Literal["lru", "2q"] = "lru"  # "2q" protects models reused across jobs
 
     # Server
     host: str = "127.0.0.1"
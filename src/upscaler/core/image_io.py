@@ -3,55 +3,124 @@
 from __future__ import annotations
 
 import logging
+import os
+import warnings
 from pathlib import Path
+from typing import BinaryIO
 
 import numpy as np
 import torch
 from PIL import Image
 
+try:
+    from numba import njit, prange
+except ImportError:  # optional speedup
+    njit = None
+
 logger = logging.getLogger(__name__)
 
 SUPPORTED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tiff", ".tif"}
 
 
-def load_image_as_tensor(path: str | Path, device: str = "cpu") -> torch.Tensor:
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _f32_to_u8_hwc(src, dst):
+        """Fused clamp/scale/round/cast from (C, H, W) float32 to (H, W, C) uint8."""
+        c_dim, h_dim, w_dim = src.shape
+        lo, hi, scale = np.float32(0.0), np.float32(1.0), np.float32(255.0)
+        for y in prange(h_dim):
+            for x in range(w_dim):
+                for c in range(c_dim):
+                    v = min(max(src[c, y, x], lo), hi)
+                    dst[y, x, c] = np.uint8(np.rint(v * scale))
+
+    # Compiled on the first CPU save, not at import (most processes never do
+    # one); cache=True keeps the compiled kernel on disk for later runs.
+else:
+    _f32_to_u8_hwc = None
+
+
+def load_image_as_tensor(
+    path: str | Path | BinaryIO,
+    device: str = "cpu",
+    out: torch.Tensor | None = None,
+) -> torch.Tensor:
     """Load an image file and return a float32 tensor of shape (1, C, H, W) in [0, 1].
 
     RGBA images are converted to RGB with a warning. Unsupported formats raise ValueError.
-    """
-    path = Path(path)
-    if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-        raise ValueError(f"Unsupported image format: {path.suffix}")
-
-    img = Image.open(path)
+    ``path`` may also be a binary file object, whose format is detected from its data.
 
-    if img.mode == "RGBA":
-        logger.warning("Image has alpha channel — stripping alpha: %s", path.name)
-        img = img.convert("RGB")
-    elif img.mode != "RGB":
-        img = img.convert("RGB")
-
-    arr = np.array(img).astype(np.float32) / 255.0  # (H, W, 3)
-    tensor = torch.from_numpy(arr).permute(2, 0, 1).unsqueeze(0)  # (1, 3, H, W)
-    return tensor.to(device)
+    If ``out`` is given, the image is written into it (on its device and in its
+    float dtype; ``device`` is ignored) and it is returned, so repeated loads of
+    same-sized images can reuse one buffer. Its shape must match the image.
+    """
+    if isinstance(path, (str, os.PathLike)):
+        path = Path(path)
+        if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Unsupported image format: {path.suffix}")
+        name = path.name
+    else:
+        name = getattr(path, "name", "<stream>")
+
+    # Decode inside the with block so the file descriptor is released right away
+    # rather than whenever the Image is garbage collected
+    with Image.open(path) as img:
+        # Most inputs (JPEG) are already RGB; that case does a single comparison
+        mode = img.mode
+        if mode != "RGB":
+            if mode == "RGBA":
+                logger.warning("Image has alpha channel — stripping alpha: %s", name)
+            img = img.convert("RGB")
+
+        # asarray wraps the tobytes() buffer without a second copy. It is read-only,
+        # which is fine: the uint8 tensor is only ever copied (pin/H2D or float cast).
+        # Move uint8 (4x fewer bytes than float32) and normalize on the target device
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+            tensor = torch.from_numpy(np.asarray(img))  # (H, W, 3) uint8
+    if out is not None:
+        chw = tensor.permute(2, 0, 1).unsqueeze(0)
+        if out.shape != chw.shape:
+            raise ValueError(f"out has shape {tuple(out.shape)}, image needs {tuple(chw.shape)}")
+        return out.copy_(chw).div_(255.0)
+    if device.startswith("cuda"):
+        tensor = tensor.pin_memory().to(device, non_blocking=True)
+    tensor = tensor.permute(2, 0, 1).unsqueeze(0)  # (1, 3, H, W)
+    return tensor.to(torch.float32, memory_format=torch.contiguous_format).div_(255.0)
 
 
 def save_tensor_as_image(
     tensor: torch.Tensor,
-    path: str | Path,
+    path: str | Path | BinaryIO,
     format: str = "png",
     jpeg_quality: int = 95,
-) -> Path:
-    """Save a (1, C, H, W) or (C, H, W) float tensor in [0, 1] to an image file."""
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
+) -> Path | BinaryIO:
+    """Save a (1, C, H, W) or (C, H, W) float tensor in [0, 1] to an image file.
+
+    Half-precision tensors are accepted and quantized without upcasting.
+    ``path`` may also be a writable binary file object (e.g. ``io.BytesIO``).
+    """
+    if isinstance(path, (str, os.PathLike)):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
 
     if tensor.dim() == 4:
         tensor = tensor.squeeze(0)
 
-    arr = tensor.detach().cpu().clamp(0, 1).permute(1, 2, 0).numpy()
-    arr = (arr * 255.0).round().astype(np.uint8)
-    img = Image.fromarray(arr, "RGB")
+    t = tensor.detach()
+    if t.device.type == "cpu" and _f32_to_u8_hwc is not None:
+        src = t.float().contiguous().numpy()
+        arr = np.empty((src.shape[1], src.shape[2], src.shape[0]), dtype=np.uint8)
+        _f32_to_u8_hwc(src, arr)
+    else:
+        # Quantize on the tensor's own device so only uint8 HWC bytes cross to the host.
+        # fp16 outputs are quantized as-is: 0..255 is exact in half precision.
+        t = t.clamp(0, 1).mul_(255.0).round_().to(torch.uint8)
+        arr = t.permute(1, 2, 0).contiguous().cpu().numpy()
+    # arr is C-contiguous HWC uint8 on both paths, so hand the buffer to PIL directly
+    # instead of going through fromarray's __array_interface__ inspection
+    h, w, _ = arr.shape
+    img = Image.frombuffer("RGB", (w, h), arr, "raw", "RGB", 0, 1)
 
     save_kwargs: dict = {}
     if format.lower() in ("jpg", "jpeg"):
@@ -71,10 +140,12 @@ def generate_thumbnail(
     path: str | Path, max_size: int = 256
 ) -> Image.Image:
     """Generate a thumbnail for preview purposes."""
-    img = Image.open(path)
-    if img.mode != "RGB":
-        img = img.convert("RGB")
-    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    with Image.open(path) as img:
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale; no-op for other formats
+        img.draft("RGB", (max_size * 2, max_size * 2))
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)  # loads pixel data
     return img
 
 
@@ -0,0 +1,26 @@
+"""Shared lookup tables for output formats, file extensions, and media types."""
+
+from __future__ import annotations
+
+from types import MappingProxyType
+
+# Output format name → file extension
+FORMAT_TO_EXT = MappingProxyType({
+    "png": ".png",
+    "jpg": ".jpg",
+    "jpeg": ".jpg",
+    "webp": ".webp",
+    "bmp": ".bmp",
+    "tiff": ".tiff",
+})
+
+# File extension → HTTP media type
+EXT_TO_MEDIA = MappingProxyType({
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".bmp": "image/bmp",
+    ".tiff": "image/tiff",
+    ".tif": "image/tiff",
+})
@@ -1,10 +1,9 @@
-"""Model scanning, loading via Spandrel, LRU caching, and metadata management."""
+"""Model scanning, loading via Spandrel, cached loading, and metadata management."""
 
 from __future__ import annotations
 
 import json
 import logging
-from collections import OrderedDict
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any, Optional
@@ -12,12 +11,18 @@ from typing import Any, Optional
 import torch
 import spandrel
 
+from upscaler.core.cache_policy import CACHE_POLICIES, GPUCachePolicy
 from upscaler.core.config import settings
+from upscaler.core.model_registry import _stable_mtime_ns, get_entry_by_filename
 from upscaler.core.progress import EventType, ProgressReporter
+from upscaler.core.tiling import prefers_channels_last
 
 logger = logging.getLogger(__name__)
 
 MODEL_EXTENSIONS = {".pth", ".safetensors"}
+# File stamps stored next to ModelInfo fields in the metadata cache
+_STAMP_KEYS = ("mtime_ns", "size")
+_CACHE_VERSION = 1
 
 
 @dataclass
@@ -33,70 +38,126 @@ class ModelInfo:
 
 
 class ModelManager:
-    """Scans for models, loads them via Spandrel with LRU caching."""
+    """Scans for models, loads them via Spandrel with a bounded model cache."""
 
     def __init__(
         self,
         models_dir: Path | None = None,
         max_loaded: int | None = None,
         progress: ProgressReporter | None = None,
+        policy: GPUCachePolicy | None = None,
+        memory_free_threshold: float | None = None,
     ) -> None:
         self.models_dir = models_dir or settings.models_path
         self.max_loaded = max_loaded or settings.max_loaded_models
+        # Also evict while free VRAM is below this fraction of the total (0 disables)
+        self.memory_free_threshold = (
+            settings.memory_free_threshold if memory_free_threshold is None else memory_free_threshold
+        )
         self.progress = progress or ProgressReporter()
 
         self._registry: dict[str, ModelInfo] = {}       # model_id → info
-        self._loaded: OrderedDict[str, Any] = OrderedDict()  # model_id → loaded model (LRU)
-        self._fp16_incompatible: set[str] = set()  # models that don't support fp16
+        # model_id → loaded model; the policy decides eviction order
+        self._loaded: GPUCachePolicy = policy or CACHE_POLICIES[settings.model_cache_policy]()
+        self._pinned: dict[str, int] = {}  # model_id → active users; never evicted while > 0
         self._cache_path = self.models_dir / ".model_cache.json"
+        self._stamps: dict[str, tuple[int, int]] = {}  # model_id → (mtime_ns, size) of the file
+        self._probe_loader: spandrel.ModelLoader | None = None  # created on first probe
+        self._scan_mtime_ns = -1  # models_dir mtime at the last full scan
 
     # --- Scanning ---
 
     def scan(self) -> list[ModelInfo]:
-        """Scan models directory and populate registry with metadata."""
+        """Scan models directory and populate registry with metadata.
+
+        Skipped when the directory's mtime hasn't changed since the last scan
+        (adding, removing or renaming a model file always bumps it); see
+        _stable_mtime_ns for why very recent changes always rescan.
+        """
         self.models_dir.mkdir(parents=True, exist_ok=True)
+        dir_mtime = _stable_mtime_ns(self.models_dir)
+        if dir_mtime is not None and dir_mtime == self._scan_mtime_ns:
+            return list(self._registry.values())
         cached = self._load_metadata_cache()
 
         for file in sorted(self.models_dir.iterdir()):
             if file.suffix.lower() not in MODEL_EXTENSIONS:
                 continue
-            model_id = file.stem
-            if model_id in cached:
-                self._registry[model_id] = ModelInfo(**cached[model_id])
-            else:
-                info = ModelInfo(
-                    model_id=model_id,
-                    filename=file.name,
-                    path=str(file),
-                    file_size_mb=round(file.stat().st_size / (1024 * 1024), 1),
-                )
-                # Probe with Spandrel to get architecture/scale
-                try:
-                    self._probe_model(info, file)
-                except Exception as e:
-                    logger.warning("Failed to probe model %s: %s", model_id, e)
-
-                self._registry[model_id] = info
+            self._registry[file.stem] = self._build_info(file, cached)
 
         self._save_metadata_cache()
+        # Taken before listing, so a file added mid-scan triggers another scan
+        self._scan_mtime_ns = -1 if dir_mtime is None else dir_mtime
         return list(self._registry.values())
 
+    def find_model_info(self, model_id: str) -> ModelInfo | None:
+        """Look up a single model by id without scanning the whole models directory.
+
+        Checks the expected filenames directly and reuses cached metadata if present.
+        Returns None if no such file exists (callers may fall back to scan()).
+        """
+        if model_id in self._registry:
+            return self._registry[model_id]
+        for ext in MODEL_EXTENSIONS:
+            file = self.models_dir / f"{model_id}{ext}"
+            if file.is_file():
+                info = self._build_info(file, self._load_metadata_cache())
+                self._registry[model_id] = info
+                return info
+        return None
+
+    def _build_info(self, file: Path, cached: dict[str, dict]) -> ModelInfo:
+        """Metadata for one model file: from the cache, the download registry, or a probe.
+
+        Cache entries are reused only if the file's mtime and size still match,
+        so a replaced model file is re-probed.
+        """
+        model_id = file.stem
+        st = file.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        self._stamps[model_id] = stamp
+
+        entry = cached.get(model_id)
+        if entry is not None and (entry.get("mtime_ns"), entry.get("size")) == stamp:
+            return ModelInfo(**{k: v for k, v in entry.items() if k not in _STAMP_KEYS})
+
+        info = ModelInfo(
+            model_id=model_id,
+            filename=file.name,
+            path=str(file),
+            file_size_mb=round(st.st_size / (1024 * 1024), 1),
+        )
+        known = get_entry_by_filename(file.name)
+        if known is not None:
+            # Downloaded from the registry: architecture and scale are already known
+            info.architecture = known.architecture
+            info.scale = known.scale
+            return info
+
+        # Probe with Spandrel to get architecture/scale
+        try:
+            self._probe_model(info, file)
+        except Exception as e:
+            logger.warning("Failed to probe model %s: %s", model_id, e)
+        return info
+
     def _probe_model(self, info: ModelInfo, path: Path) -> None:
         """Load model briefly to detect architecture and scale."""
-        loader = spandrel.ModelLoader(device="cpu")
-        model = loader.load_from_file(path)
+        if self._probe_loader is None:
+            self._probe_loader = spandrel.ModelLoader(device="cpu")
+        model = self._probe_loader.load_from_file(path)
         info.architecture = model.architecture.name
         info.scale = model.scale
         info.input_channels = model.input_channels
         del model
         torch.cuda.empty_cache()
 
-    # --- Loading (LRU) ---
+    # --- Loading (cached) ---
 
     def get_model(self, model_id: str) -> Any:
-        """Get a loaded model, loading from disk if needed. Uses LRU eviction."""
+        """Get a loaded model, loading from disk if needed. Evicts per the cache policy."""
         if model_id in self._loaded:
-            self._loaded.move_to_end(model_id)
+            self._loaded.touch(model_id)
             return self._loaded[model_id]
 
         if model_id not in self._registry:
@@ -112,20 +173,25 @@ class ModelManager:
         loader = spandrel.ModelLoader(device=device)
         model = loader.load_from_file(info.path)
 
-        if settings.fp16 and device == "cuda" and model_id not in self._fp16_incompatible:
-            model.model.half()
+        if prefers_channels_last(torch.device(device)):
+            # Matches the NHWC tiles process_tiles feeds on these GPUs
+            model.model.to(memory_format=torch.channels_last)
 
         model.model.eval()
         self._loaded[model_id] = model
         self.progress.emit(EventType.MODEL_LOADED, model_id=model_id)
         return model
 
-    def reload_model_fp32(self, model_id: str) -> Any:
-        """Reload a model in fp32 after fp16 failure. Marks it as fp16-incompatible."""
-        logger.warning("Model %s is not compatible with fp16, reloading in fp32", model_id)
-        self._fp16_incompatible.add(model_id)
-        self.unload_model(model_id)
-        return self.get_model(model_id)
+    def pin(self, model_id: str) -> None:
+        """Protect a model from eviction until the matching unpin (calls nest)."""
+        self._pinned[model_id] = self._pinned.get(model_id, 0) + 1
+
+    def unpin(self, model_id: str) -> None:
+        count = self._pinned.get(model_id, 0) - 1
+        if count > 0:
+            self._pinned[model_id] = count
+        else:
+            self._pinned.pop(model_id, None)
 
     def unload_model(self, model_id: str) -> None:
         """Explicitly unload a model from GPU memory."""
@@ -140,12 +206,31 @@ class ModelManager:
         torch.cuda.empty_cache()
 
     def _evict_if_needed(self) -> None:
-        """Evict least-recently-used models if at capacity."""
-        while len(self._loaded) >= self.max_loaded:
-            evicted_id, _ = self._loaded.popitem(last=False)
+        """Evict models chosen by the cache policy if at capacity or short on VRAM.
+
+        A count limit alone can't account for model size: one large model plus
+        two small ones may fit the count yet leave too little memory for tiles.
+        Pinned models are in use and are never chosen, even if that means
+        going over the limit.
+        """
+        while self._loaded and (len(self._loaded) >= self.max_loaded or self._vram_low()):
+            victim = self._loaded.evict_victim(self._pinned)
+            if victim is None:
+                logger.warning("All loaded models are in use; loading one more over the cache limit")
+                break
+            evicted_id = victim[0]
+            # Drop the last reference to the model so empty_cache can actually
+            # release its memory before _vram_low is checked again
+            del victim
             torch.cuda.empty_cache()
             logger.info("Evicted model from cache: %s", evicted_id)
 
+    def _vram_low(self) -> bool:
+        if self.memory_free_threshold <= 0 or not torch.cuda.is_available():
+            return False
+        free, total = torch.cuda.mem_get_info()
+        return free / total < self.memory_free_threshold
+
     # --- Info ---
 
     def list_models(self) -> list[ModelInfo]:
@@ -166,16 +251,24 @@ class ModelManager:
     def _load_metadata_cache(self) -> dict[str, dict]:
         if self._cache_path.exists():
             try:
-                with open(self._cache_path) as f:
-                    return json.load(f)
+                with open(self._cache_path, "rb") as f:
+                    data = json.load(f)
             except (json.JSONDecodeError, OSError):
                 return {}
+            # Older unversioned caches have no file stamps; drop them and re-read once
+            if isinstance(data, dict) and data.get("version") == _CACHE_VERSION:
+                return data.get("entries", {})
         return {}
 
     def _save_metadata_cache(self) -> None:
-        cache_data = {mid: asdict(info) for mid, info in self._registry.items()}
+        cache_data = {}
+        for mid, info in self._registry.items():
+            entry = asdict(info)
+            if mid in self._stamps:
+                entry["mtime_ns"], entry["size"] = self._stamps[mid]
+            cache_data[mid] = entry
         try:
             with open(self._cache_path, "w") as f:
-                json.dump(cache_data, f, indent=2)
+                json.dump({"version": _CACHE_VERSION, "entries": cache_data}, f, separators=(",", ":"))
         except OSError as e:
             logger.warning("Failed to save metadata cache: %s", e)
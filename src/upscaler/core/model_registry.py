@@ -3,6 +3,10 @@
 from __future__ import annotations
 
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -13,6 +17,15 @@ from upscaler.core.progress import EventType, ProgressReporter
 
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# Minimum seconds between DOWNLOAD_PROGRESS events (the final one is always sent)
+PROGRESS_EMIT_INTERVAL = 0.05
+# Large files are fetched as up to this many parallel byte ranges of at least
+# DOWNLOAD_SEGMENT_MIN bytes each; small files and servers without Range support
+# use one stream
+DOWNLOAD_CONNECTIONS = 8
+DOWNLOAD_SEGMENT_MIN = 8 * 1024 * 1024
+
 
 @dataclass
 class RegistryEntry:
@@ -60,24 +73,66 @@ KNOWN_MODELS: list[RegistryEntry] = [
 ]
 
 
+# O(1) lookups for the API/CLI handlers and ModelManager.scan
+_BY_KEY: dict[str, RegistryEntry] = {m.key: m for m in KNOWN_MODELS}
+_BY_FILENAME: dict[str, RegistryEntry] = {m.filename: m for m in KNOWN_MODELS}
+
+
 def list_available() -> list[RegistryEntry]:
     """Return all known downloadable models."""
     return list(KNOWN_MODELS)
 
 
+# Directory mtimes younger than this aren't trusted as cache keys
+_MTIME_SETTLE_NS = 1_000_000_000
+
+
+def _stable_mtime_ns(path: Path) -> int | None:
+    """A directory's mtime for use as a cache key, or None if it's too recent.
+
+    Filesystem timestamps are coarse (often one kernel tick), so a change made
+    within the same tick as a cached listing would look unchanged; listings of
+    just-modified directories are therefore not cached.
+    """
+    mtime = path.stat().st_mtime_ns
+    return mtime if time.time_ns() - mtime > _MTIME_SETTLE_NS else None
+
+
+# models_dir → (dir mtime_ns, entries not on disk); polled by the web UI
+_not_downloaded_cache: dict[Path, tuple[int, list[RegistryEntry]]] = {}
+
+
 def list_not_downloaded(models_dir: Path | None = None) -> list[RegistryEntry]:
-    """Return registry entries for models not yet present on disk."""
+    """Return registry entries for models not yet present on disk.
+
+    The directory is only re-listed when its mtime changes.
+    """
     models_dir = models_dir or settings.models_path
-    existing = {f.name for f in models_dir.iterdir()} if models_dir.exists() else set()
-    return [m for m in KNOWN_MODELS if m.filename not in existing]
+    try:
+        mtime = _stable_mtime_ns(models_dir)
+    except FileNotFoundError:
+        return list(KNOWN_MODELS)
+
+    hit = _not_downloaded_cache.get(models_dir)
+    if mtime is None or hit is None or hit[0] != mtime:
+        with os.scandir(models_dir) as it:
+            existing = {entry.name for entry in it}
+        hit = (mtime, [m for m in KNOWN_MODELS if m.filename not in existing])
+        if mtime is not None:
+            _not_downloaded_cache[models_dir] = hit
+    return list(hit[1])
+
+
+
+
+def get_entry_by_filename(filename: str) -> RegistryEntry | None:
+    """Look up a registry entry by its downloaded filename."""
+    return _BY_FILENAME.get(filename)
 
 
 def get_entry(key: str) -> RegistryEntry | None:
     """Look up a registry entry by key."""
-    for entry in KNOWN_MODELS:
-        if entry.key == key:
-            return entry
-    return None
+    return _BY_KEY.get(key)
 
 
 def download_model(
@@ -100,25 +155,127 @@ def download_model(
 
     logger.info("Downloading %s from %s", entry.name, entry.url)
 
-    with httpx.stream("GET", entry.url, follow_redirects=True, timeout=300) as resp:
+    # Write to a side file and rename at the end, so an interrupted download never
+    # leaves a (preallocated, full-size) file that looks complete
+    part = dest.with_name(dest.name + ".part")
+    report = _DownloadProgress(key, progress)
+    try:
+        with httpx.Client(follow_redirects=True, timeout=300) as client:
+            url, total = _probe_ranges(client, entry.url)
+            if total >= 2 * DOWNLOAD_SEGMENT_MIN:
+                _download_ranged(client, url, part, total, report)
+            else:
+                _download_single(client, entry.url, part, report)
+        report.finish()
+        os.replace(part, dest)
+    finally:
+        part.unlink(missing_ok=True)
+
+    logger.info("Downloaded: %s (%.1f MB)", dest, dest.stat().st_size / (1024 * 1024))
+    return dest
+
+
+class _DownloadProgress:
+    """Thread-safe byte counter that forwards throttled DOWNLOAD_PROGRESS events."""
+
+    def __init__(self, key: str, progress: ProgressReporter | None) -> None:
+        self.key = key
+        self.progress = progress
+        self.total = 0
+        self.downloaded = 0
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, n: int) -> None:
+        with self._lock:
+            self.downloaded += n
+            now = time.monotonic()
+            if now - self._last_emit < PROGRESS_EMIT_INTERVAL:
+                return
+            self._last_emit = now
+            downloaded = self.downloaded
+        self._emit(downloaded)
+
+    def finish(self) -> None:
+        self._emit(self.downloaded)
+
+    def _emit(self, downloaded: int) -> None:
+        if self.progress:
+            self.progress.emit(
+                EventType.DOWNLOAD_PROGRESS,
+                model_key=self.key,
+                downloaded=downloaded,
+                total=self.total,
+            )
+
+
+def _probe_ranges(client: httpx.Client, url: str) -> tuple[str, int]:
+    """Return (final URL, size) if the server honours byte ranges, else (url, 0).
+
+    A one-byte ranged GET is more reliable than HEAD: some mirrors omit
+    Accept-Ranges but still answer 206 with the full size in Content-Range.
+    """
+    try:
+        resp = client.get(url, headers={"Range": "bytes=0-0"})
+    except httpx.HTTPError:
+        return url, 0
+    content_range = resp.headers.get("content-range", "")
+    if resp.status_code != 206 or "/" not in content_range:
+        return url, 0
+    size = content_range.rsplit("/", 1)[1]
+    # Reuse the post-redirect URL so each segment skips the redirect hop
+    return (str(resp.url), int(size)) if size.isdigit() else (url, 0)
+
+
+def _download_single(
+    client: httpx.Client, url: str, part: Path, report: _DownloadProgress
+) -> None:
+    with client.stream("GET", url) as resp:
         resp.raise_for_status()
-        total = int(resp.headers.get("content-length", 0))
-        downloaded = 0
+        report.total = int(resp.headers.get("content-length", 0))
 
-        with open(dest, "wb") as f:
-            for chunk in resp.iter_bytes(chunk_size=8192):
+        with open(part, "wb") as f:
+            for chunk in resp.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
                 f.write(chunk)
-                downloaded += len(chunk)
-                if progress:
-                    progress.emit(
-                        EventType.DOWNLOAD_PROGRESS,
-                        model_key=key,
-                        downloaded=downloaded,
-                        total=total,
-                    )
+                report.add(len(chunk))
 
-    logger.info("Downloaded: %s (%.1f MB)", dest, dest.stat().st_size / (1024 * 1024))
-    return dest
+
+def _download_ranged(
+    client: httpx.Client, url: str, part: Path, total: int, report: _DownloadProgress
+) -> None:
+    """Fetch non-overlapping byte ranges in parallel, each pwrite-ing its own slice."""
+    report.total = total
+    n = min(DOWNLOAD_CONNECTIONS, total // DOWNLOAD_SEGMENT_MIN)
+    bounds = [total * i // n for i in range(n + 1)]
+
+    fd = os.open(part, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.ftruncate(fd, total)
+
+        def fetch(start: int, end: int) -> None:
+            headers = {"Range": f"bytes={start}-{end - 1}"}
+            with client.stream("GET", url, headers=headers) as resp:
+                resp.raise_for_status()
+                if resp.status_code != 206:
+                    raise httpx.HTTPError(f"Server ignored Range request (HTTP {resp.status_code})")
+                offset = start
+                for chunk in resp.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if offset + len(chunk) > end:
+                        raise httpx.HTTPError("Server sent more bytes than requested")
+                    report.add(len(chunk))
+                    view = memoryview(chunk)
+                    while view:  # pwrite may write less than asked
+                        written = os.pwrite(fd, view, offset)
+                        view = view[written:]
+                        offset += written
+                if offset != end:
+                    raise httpx.HTTPError(f"Segment {start}-{end - 1} ended early at {offset}")
+
+        with ThreadPoolExecutor(max_workers=n, thread_name_prefix="model-download") as pool:
+            for future in [pool.submit(fetch, lo, hi) for lo, hi in zip(bounds, bounds[1:])]:
+                future.result()
+    finally:
+        os.close(fd)
 
 
 def is_models_dir_empty(models_dir: Path | None = None) -> bool:
@@ -19,7 +19,7 @@ class EventType(str, Enum):
     DOWNLOAD_PROGRESS = "download_progress"
 
 
-@dataclass
+@dataclass(slots=True)
 class ProgressEvent:
     event_type: EventType
     data: dict[str, Any] = field(default_factory=dict)
@@ -42,6 +42,9 @@ class ProgressReporter:
         self._callbacks.remove(cb)
 
     def emit(self, event_type: EventType, **data: Any) -> None:
-        event = ProgressEvent(event_type=event_type, data=data)
+        # Hot path (once per tile): don't build an event nobody will see
+        if not self._callbacks:
+            return
+        event = ProgressEvent(event_type, data)
         for cb in self._callbacks:
             cb(event)
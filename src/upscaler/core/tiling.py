@@ -5,8 +5,10 @@ from __future__ import annotations
 import logging
 import math
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Callable
 
+import numpy as np
 import torch
 
 logger = logging.getLogger(__name__)
@@ -23,28 +25,61 @@ class TilePosition:
     col: int
 
 
-def compute_tiles(
+def compute_tiles_soa(
     img_width: int,
     img_height: int,
     tile_size: int = 512,
     overlap: int = 32,
-) -> list[TilePosition]:
-    """Compute tile positions to cover the image with overlap."""
-    tiles = []
+) -> dict[str, np.ndarray]:
+    """Compute tile positions as parallel arrays (structure of arrays).
+
+    Returns ``x``, ``y``, ``w``, ``h``, ``row`` and ``col`` arrays in row-major
+    tile order, so the tiling loop reads plain ints instead of allocating and
+    dereferencing one object per tile.
+    """
     step = tile_size - overlap
 
     rows = max(1, math.ceil((img_height - overlap) / step))
     cols = max(1, math.ceil((img_width - overlap) / step))
 
-    for row in range(rows):
-        for col in range(cols):
-            x = min(col * step, max(0, img_width - tile_size))
-            y = min(row * step, max(0, img_height - tile_size))
-            w = min(tile_size, img_width - x)
-            h = min(tile_size, img_height - y)
-            tiles.append(TilePosition(x=x, y=y, width=w, height=h, row=row, col=col))
+    row, col = np.meshgrid(np.arange(rows), np.arange(cols), indexing="ij")
+    row, col = row.ravel(), col.ravel()
+    x = np.minimum(col * step, max(0, img_width - tile_size))
+    y = np.minimum(row * step, max(0, img_height - tile_size))
+    return {
+        "x": x,
+        "y": y,
+        "w": np.minimum(tile_size, img_width - x),
+        "h": np.minimum(tile_size, img_height - y),
+        "row": row,
+        "col": col,
+    }
+
 
-    return tiles
+def compute_tiles(
+    img_width: int,
+    img_height: int,
+    tile_size: int = 512,
+    overlap: int = 32,
+) -> list[TilePosition]:
+    """Compute tile positions to cover the image with overlap."""
+    soa = compute_tiles_soa(img_width, img_height, tile_size, overlap)
+    return [
+        TilePosition(x=x, y=y, width=w, height=h, row=row, col=col)
+        for x, y, w, h, row, col in zip(
+            *(soa[k].tolist() for k in ("x", "y", "w", "h", "row", "col"))
+        )
+    ]
+
+
+@lru_cache(maxsize=None)
+def prefers_channels_last(device: torch.device) -> bool:
+    """Whether convolutions on this device run faster in NHWC (channels_last).
+
+    True for CUDA GPUs with Tensor Cores (compute capability 7.0+), where cuDNN
+    has dedicated NHWC kernels.
+    """
+    return device.type == "cuda" and torch.cuda.get_device_capability(device)[0] >= 7
 
 
 def extract_tile(image: torch.Tensor, tile: TilePosition) -> torch.Tensor:
@@ -52,32 +87,68 @@ def extract_tile(image: torch.Tensor, tile: TilePosition) -> torch.Tensor:
     return image[:, :, tile.y:tile.y + tile.height, tile.x:tile.x + tile.width]
 
 
+@lru_cache(maxsize=32)
+def _ramp(n: int, device: str, ascending: bool) -> torch.Tensor:
+    """Shared 1-D fade ramp (0→1 or 1→0); callers must not modify it in place."""
+    start, end = (0, 1) if ascending else (1, 0)
+    return torch.linspace(start, end, n, device=device)
+
+
 def _build_blend_mask(h: int, w: int, overlap: int, scale: int, device: torch.device) -> torch.Tensor:
     """Build a linear gradient blend mask for tile overlap regions."""
     scaled_overlap = overlap * scale
     mask = torch.ones(1, 1, h, w, device=device)
 
     if scaled_overlap > 0:
-        # Top edge fade
+        fade_in = _ramp(scaled_overlap, str(device), True)
+        fade_out = _ramp(scaled_overlap, str(device), False)
         if h > scaled_overlap:
-            ramp = torch.linspace(0, 1, scaled_overlap, device=device)
-            mask[:, :, :scaled_overlap, :] *= ramp.view(1, 1, -1, 1)
-        # Left edge fade
+            mask[:, :, :scaled_overlap, :].mul_(fade_in.view(1, 1, -1, 1))  # top
+            mask[:, :, -scaled_overlap:, :].mul_(fade_out.view(1, 1, -1, 1))  # bottom
         if w > scaled_overlap:
-            ramp = torch.linspace(0, 1, scaled_overlap, device=device)
-            mask[:, :, :, :scaled_overlap] *= ramp.view(1, 1, 1, -1)
-        # Bottom edge fade
-        if h > scaled_overlap:
-            ramp = torch.linspace(1, 0, scaled_overlap, device=device)
-            mask[:, :, -scaled_overlap:, :] *= ramp.view(1, 1, -1, 1)
-        # Right edge fade
-        if w > scaled_overlap:
-            ramp = torch.linspace(1, 0, scaled_overlap, device=device)
-            mask[:, :, :, -scaled_overlap:] *= ramp.view(1, 1, 1, -1)
+            mask[:, :, :, :scaled_overlap].mul_(fade_in.view(1, 1, 1, -1))  # left
+            mask[:, :, :, -scaled_overlap:].mul_(fade_out.view(1, 1, 1, -1))  # right
+
+    return mask
+
+
+def _build_tile_mask(
+    h: int,
+    w: int,
+    overlap: int,
+    scale: int,
+    device: torch.device,
+    edge_top: bool,
+    edge_left: bool,
+    edge_bottom: bool,
+    edge_right: bool,
+) -> torch.Tensor:
+    """Blend mask for one tile, with no fade on sides that touch the image boundary."""
+    mask = _build_blend_mask(h, w, overlap, scale, device)
+
+    scaled_overlap = overlap * scale
+    if scaled_overlap > 0:
+        if edge_top and h > scaled_overlap:
+            mask[:, :, :scaled_overlap, :] = 1.0
+        if edge_left and w > scaled_overlap:
+            mask[:, :, :, :scaled_overlap] = 1.0
+        if edge_bottom and h > scaled_overlap:
+            mask[:, :, -scaled_overlap:, :] = 1.0
+        if edge_right and w > scaled_overlap:
+            mask[:, :, :, -scaled_overlap:] = 1.0
 
     return mask
 
 
+# Auto batch size keeps roughly this many input pixels per forward pass, so large
+# tiles run one at a time and small tiles are grouped to fill the GPU
+_AUTO_BATCH_PIXELS = 256 * 256
+
+
+def _auto_batch_size(tile_size: int) -> int:
+    return max(1, _AUTO_BATCH_PIXELS // (tile_size * tile_size))
+
+
 def process_tiles(
     image: torch.Tensor,
     process_fn: Callable[[torch.Tensor], torch.Tensor],
@@ -85,21 +156,34 @@ def process_tiles(
     tile_size: int = 512,
     overlap: int = 32,
     progress_fn: Callable[[int, int], None] | None = None,
+    batch_size: int | None = None,
 ) -> torch.Tensor:
     """Split image into tiles, process each, blend and reassemble.
 
-    Includes OOM recovery: on CUDA OOM, halve tile size and retry.
+    Same-sized tiles are stacked into batches of ``batch_size`` (auto-sized from
+    the tile size when None) so each model forward pass covers several tiles.
+
+    Includes OOM recovery: on CUDA OOM, halve the batch size down to 1, then
+    halve tile size and retry.
     """
     _, c, h, w = image.shape
     current_tile_size = tile_size
+    current_batch = batch_size or _auto_batch_size(tile_size)
 
     while True:
         try:
             return _process_tiles_inner(
-                image, process_fn, scale, current_tile_size, overlap, progress_fn
+                image, process_fn, scale, current_tile_size, overlap, progress_fn, current_batch
             )
         except torch.cuda.OutOfMemoryError:
             torch.cuda.empty_cache()
+            if current_batch > 1:
+                logger.warning(
+                    "CUDA OOM with %d tiles per batch, retrying with %d",
+                    current_batch, current_batch // 2,
+                )
+                current_batch //= 2
+                continue
             new_size = max(64, current_tile_size // 2)
             if new_size == current_tile_size:
                 raise
@@ -110,6 +194,9 @@ def process_tiles(
             current_tile_size = new_size
 
 
+# Pure inference: inference_mode also skips the version-counter and view
+# tracking that no_grad still does
+@torch.inference_mode()
 def _process_tiles_inner(
     image: torch.Tensor,
     process_fn: Callable[[torch.Tensor], torch.Tensor],
@@ -117,55 +204,86 @@ def _process_tiles_inner(
     tile_size: int,
     overlap: int,
     progress_fn: Callable[[int, int], None] | None,
+    batch_size: int = 1,
 ) -> torch.Tensor:
     """Inner tile processing loop."""
     _, c, h, w = image.shape
     out_h, out_w = h * scale, w * scale
 
-    tiles = compute_tiles(w, h, tile_size, overlap)
-    total_tiles = len(tiles)
+    tiles = compute_tiles_soa(w, h, tile_size, overlap)
+    xs, ys = tiles["x"].tolist(), tiles["y"].tolist()
+    total_tiles = len(xs)
 
-    # Accumulation buffers
-    output = torch.zeros(1, c, out_h, out_w, device=image.device)
+    # Accumulation buffers. With channels_last the model's NHWC outputs are added
+    # without a layout change, and the result is already HWC for saving.
+    channels_last = prefers_channels_last(image.device)
+    layout = torch.channels_last if channels_last else torch.contiguous_format
+    output = torch.empty(1, c, out_h, out_w, device=image.device, memory_format=layout).zero_()
     weight = torch.zeros(1, 1, out_h, out_w, device=image.device)
 
-    for i, tile in enumerate(tiles):
-        tile_input = extract_tile(image, tile)
-        with torch.no_grad():
-            tile_output = process_fn(tile_input)
-
-        _, _, th, tw = tile_output.shape
-        ox, oy = tile.x * scale, tile.y * scale
-
-        # Build blend mask
-        is_edge_top = tile.row == 0
-        is_edge_left = tile.col == 0
-        mask = _build_blend_mask(th, tw, overlap, scale, tile_output.device)
-
-        # Don't fade edges that are at the image boundary
-        scaled_overlap = overlap * scale
-        if is_edge_top and scaled_overlap > 0 and th > scaled_overlap:
-            mask[:, :, :scaled_overlap, :] = 1.0
-        if is_edge_left and scaled_overlap > 0 and tw > scaled_overlap:
-            mask[:, :, :, :scaled_overlap] = 1.0
-
-        # Check if this tile is at the bottom/right edge of the image
-        tiles_list = compute_tiles(image.shape[3], image.shape[2], tile_size, overlap)
-        max_row = max(t.row for t in tiles_list)
-        max_col = max(t.col for t in tiles_list)
-        if tile.row == max_row and scaled_overlap > 0 and th > scaled_overlap:
-            mask[:, :, -scaled_overlap:, :] = 1.0
-        if tile.col == max_col and scaled_overlap > 0 and tw > scaled_overlap:
-            mask[:, :, :, -scaled_overlap:] = 1.0
-
-        output[:, :, oy:oy + th, ox:ox + tw] += tile_output * mask
-        weight[:, :, oy:oy + th, ox:ox + tw] += mask
-
-        if progress_fn:
-            progress_fn(i + 1, total_tiles)
+    # Which image borders each tile touches, for all tiles at once. A mask depends
+    # only on the tile's output size and these flags, so at most a handful are built.
+    rows, cols = tiles["row"], tiles["col"]
+    edges = list(zip(
+        (rows == 0).tolist(),
+        (cols == 0).tolist(),
+        (rows == rows.max()).tolist(),
+        (cols == cols.max()).tolist(),
+    ))
+    masks: dict[tuple[int, int, bool, bool, bool, bool], torch.Tensor] = {}
+
+    # Only tiles of the same size can share a batch. compute_tiles_soa clamps
+    # positions so that is normally all of them; grouping keeps it correct anyway.
+    groups: dict[tuple[int, int], list[int]] = {}
+    for i, size in enumerate(zip(tiles["h"].tolist(), tiles["w"].tolist())):
+        groups.setdefault(size, []).append(i)
+
+    # On CUDA, blending runs on a side stream so accumulating batch N (memory-bound)
+    # overlaps the model forward of batch N+1 on the caller's stream
+    compute_stream = torch.cuda.current_stream(image.device) if image.is_cuda else None
+    accum_stream = torch.cuda.Stream(image.device) if image.is_cuda else None
+    if accum_stream is not None:
+        accum_stream.wait_stream(compute_stream)  # accumulation buffers are zeroed
+
+    done = 0
+    for (tile_h, tile_w), group in groups.items():
+        for start in range(0, len(group), batch_size):
+            chunk = group[start:start + batch_size]
+            slices = [image[:, :, ys[i]:ys[i] + tile_h, xs[i]:xs[i] + tile_w] for i in chunk]
+            batch = slices[0] if len(slices) == 1 else torch.cat(slices)
+            if channels_last:
+                batch = batch.contiguous(memory_format=torch.channels_last)
+            batch_output = process_fn(batch)
+            if accum_stream is not None:
+                accum_stream.wait_stream(compute_stream)
+                # Keep the allocator from reusing this memory until the side stream is done
+                batch_output.record_stream(accum_stream)
+
+            _, _, th, tw = batch_output.shape
+            with torch.cuda.stream(accum_stream):  # no-op when None (CPU)
+                for j, i in enumerate(chunk):
+                    tile_output = batch_output[j:j + 1]
+                    ox, oy = xs[i] * scale, ys[i] * scale
+
+                    key = (th, tw, *edges[i])
+                    mask = masks.get(key)
+                    if mask is None:
+                        mask = masks[key] = _build_tile_mask(
+                            th, tw, overlap, scale, batch_output.device, *edges[i],
+                        )
+
+                    # addcmul_ fuses the multiply into the accumulate: no tile-sized temporary
+                    output[:, :, oy:oy + th, ox:ox + tw].addcmul_(tile_output, mask)
+                    weight[:, :, oy:oy + th, ox:ox + tw].add_(mask)
+
+            done += len(chunk)
+            if progress_fn:
+                progress_fn(done, total_tiles)
+
+    if accum_stream is not None:
+        compute_stream.wait_stream(accum_stream)
 
     # Normalize by weight to complete the blend
-    weight = weight.clamp(min=1e-8)
-    output /= weight
+    output.div_(weight.clamp_(min=1e-8))
 
     return output
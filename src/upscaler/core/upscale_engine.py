@@ -4,14 +4,18 @@ from __future__ import annotations
 
 import logging
 import math
+from concurrent.futures import Executor, Future
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import torch
 from PIL import Image
 
 from upscaler.core.config import settings
 from upscaler.core.image_io import load_image_as_tensor, save_tensor_as_image
+from upscaler.core.media import FORMAT_TO_EXT
 from upscaler.core.model_manager import ModelManager
 from upscaler.core.progress import EventType, ProgressReporter
 from upscaler.core.tiling import process_tiles
@@ -19,6 +23,32 @@ from upscaler.core.tiling import process_tiles
 logger = logging.getLogger(__name__)
 
 
+def configure_backends() -> None:
+    """Apply the cuDNN/TF32 performance settings (process-wide flags).
+
+    Tile shapes repeat across tiles and images, so cuDNN benchmarking pays its
+    autotune cost once per shape and then reuses the fastest kernel; an OOM
+    retry with smaller tiles just benchmarks the new shape.
+    """
+    torch.backends.cudnn.benchmark = settings.cudnn_benchmark
+    torch.backends.cuda.matmul.allow_tf32 = settings.allow_tf32
+    torch.backends.cudnn.allow_tf32 = settings.allow_tf32
+
+
+def inference_autocast(device: torch.device) -> torch.autocast:
+    """Mixed-precision context for model forward passes.
+
+    Weights stay fp32 and autocast picks half precision per op, so a model with
+    fp16-unsafe layers runs those in fp32 instead of needing a full reload.
+    The half dtype is ``settings.half_dtype`` (float16 by default: bfloat16's
+    coarser mantissa can band 8-bit output). Disabled on CPU or when
+    ``settings.fp16`` is off.
+    """
+    enabled = settings.fp16 and device.type == "cuda"
+    dtype = getattr(torch, settings.half_dtype) if enabled else torch.float16
+    return torch.autocast(device_type=device.type, dtype=dtype, enabled=enabled)
+
+
 class UpscaleEngine:
     """High-level upscaling engine supporting tiling, chaining, and progress."""
 
@@ -29,6 +59,7 @@ class UpscaleEngine:
     ) -> None:
         self.model_manager = model_manager
         self.progress = progress or ProgressReporter()
+        configure_backends()
 
     def upscale(
         self,
@@ -40,18 +71,20 @@ class UpscaleEngine:
         tile_size: int | None = None,
         tile_overlap: int | None = None,
         jpeg_quality: int | None = None,
-    ) -> Path:
+        save_executor: Executor | None = None,
+    ) -> Path | Future[Path]:
         """Upscale a single image.
 
         Handles 8x by chaining passes (e.g., 4x model applied twice = 16x,
         then Lanczos downscale to exact 8x target).
+
+        If ``save_executor`` is given, encoding is submitted to it and a Future
+        for the output path is returned, so the caller's thread (and the GPU)
+        is free for the next image while PNG/WebP compression runs.
         """
         input_path = Path(input_path)
         scale = scale or settings.default_scale
         output_format = output_format or settings.default_format
-        tile_size = tile_size or settings.tile_size
-        tile_overlap = tile_overlap or settings.tile_overlap
-        jpeg_quality = jpeg_quality or settings.jpeg_quality
 
         # Determine output path
         if output_path is None:
@@ -59,81 +92,119 @@ class UpscaleEngine:
             ext = _format_to_ext(output_format)
             out_name = f"{input_path.stem}_{scale}x_{model_name}{ext}"
             output_path = settings.output_path / out_name
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Load model
+        # Load model first so the image can be decoded straight onto its device
         model = self.model_manager.get_model(model_id)
-        model_scale = model.scale
         device = next(model.model.parameters()).device
-        use_fp16 = settings.fp16 and device.type == "cuda"
-
-        # Load image
         img_tensor = load_image_as_tensor(input_path, device=str(device))
-        if use_fp16:
-            img_tensor = img_tensor.half()
 
-        # Determine how many passes needed
-        passes_needed = _compute_passes(scale, model_scale)
+        result = self.upscale_tensor(
+            img_tensor,
+            model_id=model_id,
+            scale=scale,
+            tile_size=tile_size,
+            tile_overlap=tile_overlap,
+        )
+
+        save_kwargs = dict(
+            input_path=input_path,
+            output_path=output_path,
+            model_id=model_id,
+            scale=scale,
+            output_format=output_format,
+            jpeg_quality=jpeg_quality,
+        )
+        if save_executor is not None:
+            return save_executor.submit(self.save_result, result, **save_kwargs)
+        return self.save_result(result, **save_kwargs)
+
+    def upscale_tensor(
+        self,
+        img_tensor: torch.Tensor,
+        model_id: str | None = None,
+        scale: int | None = None,
+        tile_size: int | None = None,
+        tile_overlap: int | None = None,
+    ) -> torch.Tensor:
+        """Upscale a (1, C, H, W) float tensor in [0, 1].
+
+        The input may live on any device (a pinned CPU tensor is copied
+        asynchronously). Returns a float32 tensor on the model's device.
+        """
+        scale = scale or settings.default_scale
+        tile_size = tile_size or settings.tile_size
+        tile_overlap = tile_overlap or settings.tile_overlap
 
-        current = img_tensor
+        # Pinned so a concurrent load can't evict the model between passes
+        self.model_manager.pin(model_id)
         try:
-            for pass_idx in range(passes_needed):
-                logger.info(
-                    "Pass %d/%d (model scale=%dx)",
-                    pass_idx + 1, passes_needed, model_scale,
+            model = self.model_manager.get_model(model_id)
+            model_scale = model.scale
+            device = next(model.model.parameters()).device
+            img_tensor = img_tensor.to(device, non_blocking=True)
+
+            # Determine how many passes needed
+            passes_needed = _compute_passes(scale, model_scale)
+
+            pass_num = 0
+
+            def tile_progress(done: int, total: int) -> None:
+                # Reads pass_num when called, so one closure serves every pass
+                self.progress.emit(
+                    EventType.TILE_PROGRESS,
+                    pass_num=pass_num,
+                    total_passes=passes_needed,
+                    tiles_done=done,
+                    tiles_total=total,
                 )
 
-                def process_fn(tile: torch.Tensor, _model=model) -> torch.Tensor:
-                    return _model(tile)
+            current = img_tensor
+            with inference_autocast(device):
+                for pass_idx in range(passes_needed):
+                    pass_num = pass_idx + 1
+                    logger.info(
+                        "Pass %d/%d (model scale=%dx)",
+                        pass_num, passes_needed, model_scale,
+                    )
 
-                def tile_progress(done: int, total: int, _pass=pass_idx) -> None:
-                    self.progress.emit(
-                        EventType.TILE_PROGRESS,
-                        pass_num=_pass + 1,
-                        total_passes=passes_needed,
-                        tiles_done=done,
-                        tiles_total=total,
+                    current = process_tiles(
+                        current,
+                        process_fn=model,
+                        scale=model_scale,
+                        tile_size=tile_size,
+                        overlap=tile_overlap,
+                        progress_fn=tile_progress,
+                        batch_size=settings.tile_batch_size or None,
                     )
 
-                current = process_tiles(
-                    current,
-                    process_fn=process_fn,
-                    scale=model_scale,
-                    tile_size=tile_size,
-                    overlap=tile_overlap,
-                    progress_fn=tile_progress,
-                )
-        except RuntimeError as e:
-            err_msg = str(e).lower()
-            is_dtype_error = "expected scalar type" in err_msg or "half" in err_msg or "float" in err_msg
-            if is_dtype_error and use_fp16:
-                logger.warning("Model %s failed with fp16, retrying in fp32", model_id)
-                self.model_manager.reload_model_fp32(model_id)
-                return self.upscale(
-                    input_path=input_path,
-                    output_path=output_path,
-                    model_id=model_id,
-                    scale=scale,
-                    output_format=output_format,
-                    tile_size=tile_size,
-                    tile_overlap=tile_overlap,
-                    jpeg_quality=jpeg_quality,
-                )
-            raise
+            # If total upscale overshot the target, downscale with Lanczos
+            achieved_scale = model_scale ** passes_needed
+            if achieved_scale != scale:
+                _, _, oh, ow = img_tensor.shape
+                target_h, target_w = oh * scale, ow * scale
+                current = _lanczos_resize(current, target_w, target_h)
 
-        # If total upscale overshot the target, downscale with Lanczos
-        achieved_scale = model_scale ** passes_needed
-        if achieved_scale != scale:
-            _, _, oh, ow = img_tensor.shape
-            target_h, target_w = oh * scale, ow * scale
-            current = _lanczos_resize(current, target_w, target_h)
+            return current
+        finally:
+            self.model_manager.unpin(model_id)
 
-        # Convert back to float32 for saving
-        if current.dtype == torch.float16:
-            current = current.float()
+    def save_result(
+        self,
+        tensor: torch.Tensor,
+        input_path: str | Path,
+        output_path: str | Path,
+        model_id: str | None = None,
+        scale: int | None = None,
+        output_format: str | None = None,
+        jpeg_quality: int | None = None,
+    ) -> Path:
+        """Encode an upscaled tensor to disk and report completion."""
+        output_path = Path(output_path)
+        scale = scale or settings.default_scale
+        output_format = output_format or settings.default_format
+        jpeg_quality = jpeg_quality or settings.jpeg_quality
 
-        save_tensor_as_image(current, output_path, format=output_format, jpeg_quality=jpeg_quality)
+        save_tensor_as_image(tensor, output_path, format=output_format, jpeg_quality=jpeg_quality)
 
         self.progress.emit(
             EventType.IMAGE_COMPLETE,
@@ -155,29 +226,77 @@ def _compute_passes(target_scale: int, model_scale: int) -> int:
 
 
 def _lanczos_resize(tensor: torch.Tensor, width: int, height: int) -> torch.Tensor:
-    """Downscale a (1, C, H, W) tensor to exact dimensions using Lanczos via PIL."""
-    original_device = tensor.device
-    if tensor.dtype == torch.float16:
-        tensor = tensor.float()
-    arr = tensor.squeeze(0).cpu().clamp(0, 1).permute(1, 2, 0).numpy()
-    arr = (arr * 255).round().astype("uint8")
-    img = Image.fromarray(arr, "RGB")
+    """Downscale a (1, C, H, W) tensor to exact dimensions using Lanczos.
+
+    CUDA tensors are resized on the GPU (_lanczos_resize_torch), avoiding the
+    host round-trip and uint8 quantization; CPU tensors go through PIL.
+    """
+    if tensor.device.type == "cuda":
+        return _lanczos_resize_torch(tensor, width, height)
+
+    # Quantize where the tensor lives (fp16 included) so only uint8 HWC bytes move
+    u8 = tensor.squeeze(0).clamp(0, 1).mul(255).round_().to(torch.uint8)
+    img = Image.fromarray(u8.permute(1, 2, 0).contiguous().cpu().numpy(), "RGB")
     img = img.resize((width, height), Image.Resampling.LANCZOS)
 
-    import numpy as np
-    arr = np.array(img).astype("float32") / 255.0
-    result = torch.from_numpy(arr).permute(2, 0, 1).unsqueeze(0)
-    return result.to(original_device)
+    result = torch.from_numpy(np.array(img)).to(tensor.device, non_blocking=True)
+    result = result.permute(2, 0, 1).unsqueeze(0)
+    return result.to(torch.float32, memory_format=torch.contiguous_format).div_(255.0)
+
+
+_LANCZOS_A = 3
+
+
+@lru_cache(maxsize=32)
+def _lanczos_weights(
+    in_size: int, out_size: int, device: torch.device
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Per-output-pixel source indices and weights for 1-D Lanczos-3 resampling.
+
+    Mirrors Pillow's coefficient computation (antialiased when downscaling,
+    window truncated and renormalized at the borders). Returns (index, weight),
+    both of shape (out_size, taps).
+    """
+    ratio = in_size / out_size
+    filter_scale = max(ratio, 1.0)
+    support = _LANCZOS_A * filter_scale
+    taps = int(math.ceil(support)) * 2 + 1
+
+    center = (torch.arange(out_size, dtype=torch.float64) + 0.5) * ratio
+    lo = (center - support + 0.5).floor().clamp(min=0)
+    hi = (center + support + 0.5).floor().clamp(max=in_size)
+    index = lo.unsqueeze(1) + torch.arange(taps, dtype=torch.float64)
+
+    x = (index - center.unsqueeze(1) + 0.5) / filter_scale
+    weight = torch.sinc(x) * torch.sinc(x / _LANCZOS_A)
+    weight = torch.where((x.abs() < _LANCZOS_A) & (index < hi.unsqueeze(1)), weight, 0.0)
+    weight = weight / weight.sum(dim=1, keepdim=True)
+
+    index = index.clamp(max=in_size - 1).long()
+    return index.to(device), weight.to(device=device, dtype=torch.float32)
+
+
+def _resample_last_dim(tensor: torch.Tensor, out_size: int) -> torch.Tensor:
+    """Lanczos-resample the last dimension of a float tensor to out_size."""
+    index, weight = _lanczos_weights(tensor.shape[-1], out_size, tensor.device)
+    out = torch.zeros(*tensor.shape[:-1], out_size, dtype=tensor.dtype, device=tensor.device)
+    for k in range(index.shape[1]):
+        out.add_(tensor[..., index[:, k]] * weight[:, k])
+    return out
+
+
+def _lanczos_resize_torch(tensor: torch.Tensor, width: int, height: int) -> torch.Tensor:
+    """Resize a (1, C, H, W) tensor with separable Lanczos-3 on its own device.
+
+    Same filter as _lanczos_resize but without the host round-trip or uint8
+    quantization. Returns float32 in [0, 1].
+    """
+    x = tensor.float().clamp(0, 1)
+    x = _resample_last_dim(x, width)                                   # horizontal
+    x = _resample_last_dim(x.transpose(2, 3), height).transpose(2, 3)  # vertical
+    return x.clamp_(0, 1).contiguous()
 
 
 def _format_to_ext(fmt: str) -> str:
     """Map format name to file extension."""
-    mapping = {
-        "png": ".png",
-        "jpg": ".jpg",
-        "jpeg": ".jpg",
-        "webp": ".webp",
-        "bmp": ".bmp",
-        "tiff": ".tiff",
-    }
-    return mapping.get(fmt.lower(), ".png")
+    return FORMAT_TO_EXT.get(fmt.lower(), ".png")
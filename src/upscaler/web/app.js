@@ -48,6 +48,7 @@ function app() {
         // WebSocket
         ws: null,
         wsReconnectTimer: null,
+        _wsDecoder: new TextDecoder(),
 
         async init() {
             await Alpine.store('models').refresh();
@@ -69,6 +70,7 @@ function app() {
 
             try {
                 this.ws = new WebSocket(wsUrl);
+                this.ws.binaryType = 'arraybuffer';
                 this.ws.onopen = () => {
                     console.log('WebSocket connected');
                     // Send periodic pings to keep alive
@@ -81,8 +83,14 @@ function app() {
 
                 this.ws.onmessage = (event) => {
                     try {
-                        const data = JSON.parse(event.data);
-                        this.handleWSEvent(data);
+                        // Server sends a binary frame holding a JSON array of (coalesced) events
+                        const text = typeof event.data === 'string'
+                            ? event.data
+                            : this._wsDecoder.decode(event.data);
+                        const events = JSON.parse(text);
+                        for (const data of [].concat(events)) {
+                            this.handleWSEvent(data);
+                        }
                     } catch (e) {}
                 };
 
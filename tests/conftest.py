@@ -9,43 +9,73 @@ import torch
 from PIL import Image
 
 
+@pytest.fixture(autouse=True)
+def _inference_mode():
+    """No test needs autograd; skip its version counters and view tracking."""
+    with torch.inference_mode():
+        yield
+
+
 @pytest.fixture
 def tmp_dir(tmp_path):
     """Provide a temporary directory."""
     return tmp_path
 
 
-@pytest.fixture
-def sample_image_path(tmp_path) -> Path:
+# The sample files and tensor are read-only inputs, so they are built once per
+# session. models_dir stays per-test: tests write models and caches into it.
+
+
+@pytest.fixture(scope="session")
+def samples_dir(tmp_path_factory) -> Path:
+    return tmp_path_factory.mktemp("samples")
+
+
+@pytest.fixture(scope="session")
+def sample_image_path(samples_dir) -> Path:
     """Create a small test image and return its path."""
     img = Image.fromarray(
         np.random.randint(0, 255, (64, 64, 3), dtype=np.uint8), "RGB"
     )
-    path = tmp_path / "test_image.png"
+    path = samples_dir / "test_image.png"
     img.save(path)
     return path
 
 
-@pytest.fixture
-def sample_rgba_image_path(tmp_path) -> Path:
+@pytest.fixture(scope="session")
+def sample_rgba_image_path(samples_dir) -> Path:
     """Create a test image with alpha channel."""
     img = Image.fromarray(
         np.random.randint(0, 255, (64, 64, 4), dtype=np.uint8), "RGBA"
     )
-    path = tmp_path / "test_rgba.png"
+    path = samples_dir / "test_rgba.png"
     img.save(path)
     return path
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_tensor() -> torch.Tensor:
     """Create a sample (1, 3, 64, 64) tensor in [0, 1]."""
     return torch.rand(1, 3, 64, 64)
 
 
+@pytest.fixture(scope="session")
+def rand_pool() -> dict[tuple[int, ...], torch.Tensor]:
+    """Seeded random images in [0, 1], keyed by shape. Shared: clone before mutating."""
+    g = torch.Generator().manual_seed(0)
+    shapes = [(1, 3, 64, 64), (1, 3, 100, 100), (1, 3, 128, 128), (1, 3, 100, 150)]
+    return {shape: torch.empty(shape).uniform_(0, 1, generator=g) for shape in shapes}
+
+
 @pytest.fixture
 def models_dir(tmp_path) -> Path:
     """Create a temporary models directory."""
     d = tmp_path / "models"
     d.mkdir()
     return d
+
+
+@pytest.fixture
+def fake_models_dir(fs) -> Path:
+    """A models directory on pyfakefs's in-memory filesystem (no disk I/O)."""
+    return Path(fs.create_dir("/models").path)
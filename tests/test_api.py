@@ -67,3 +67,135 @@ class TestSettingsEndpoint:
         data = response.json()
         assert data["tile_size"] == 256
         assert data["fp16"] is False
+
+
+class TestImagesEndpoint:
+    def test_serves_registered_image(self, client, sample_image_path):
+        from upscaler.api.image_index import register_image
+        register_image("indexed_img", sample_image_path)
+        response = client.get("/api/images/indexed_img")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+
+    def test_unindexed_image_found_in_subdir(self, client, tmp_path, sample_image_path):
+        from upscaler.core.config import settings
+        sub = tmp_path / "compare_abc"
+        sub.mkdir()
+        (sub / "photo_4x_model.png").write_bytes(sample_image_path.read_bytes())
+        with patch.object(settings, "temp_dir", str(tmp_path)):
+            response = client.get("/api/images/photo_4x_model")
+        assert response.status_code == 200
+
+    def test_unknown_image_404(self, client):
+        response = client.get("/api/images/does_not_exist")
+        assert response.status_code == 404
+
+    def test_stale_index_entry_404(self, client, tmp_path):
+        from upscaler.api.image_index import lookup_image, register_image
+        register_image("stale_img", tmp_path / "gone.png")
+        response = client.get("/api/images/stale_img")
+        assert response.status_code == 404
+        assert lookup_image("stale_img") is None
+
+
+class TestSaveUpload:
+    async def test_streams_upload_to_disk(self, tmp_path):
+        import io
+        from fastapi import UploadFile
+        from upscaler.api.uploads import UPLOAD_CHUNK_SIZE, save_upload
+
+        payload = b"x" * (UPLOAD_CHUNK_SIZE * 2 + 123)
+        dest = tmp_path / "upload.bin"
+        await save_upload(UploadFile(file=io.BytesIO(payload), filename="a.png"), dest)
+        assert dest.read_bytes() == payload
+
+
+class TestWebSocketCoalesce:
+    def test_keeps_latest_progress_and_all_other_events(self):
+        from upscaler.api.websocket import _coalesce
+
+        batch = [
+            {"type": "tile_progress", "tiles_done": 1},
+            {"type": "model_loaded", "model_id": "a"},
+            {"type": "tile_progress", "tiles_done": 2},
+            {"type": "image_complete"},
+            {"type": "tile_progress", "tiles_done": 3},
+        ]
+        assert _coalesce(batch) == [
+            {"type": "model_loaded", "model_id": "a"},
+            {"type": "image_complete"},
+            {"type": "tile_progress", "tiles_done": 3},
+        ]
+
+
+class TestBoundedStore:
+    def test_evicts_oldest_when_full(self):
+        from upscaler.api.store import BoundedStore
+
+        store = BoundedStore(max_entries=2)
+        store["a"] = 1
+        store["b"] = 2
+        store.get("a")  # a is now most recently used
+        store["c"] = 3
+        assert "b" not in store
+        assert store.get("a") == 1
+        assert store.get("c") == 3
+
+    def test_prune_by_age(self):
+        from upscaler.api.store import BoundedStore
+
+        store = BoundedStore()
+        store["a"] = 1
+        assert store.prune(3600) == 0
+        assert store.prune(0) == 1
+        assert len(store) == 0
+
+
+class TestWebSocketQueue:
+    def test_full_queue_drops_oldest(self):
+        from upscaler.api import websocket
+        from upscaler.core.progress import EventType, ProgressEvent
+
+        websocket._event_queue = None
+        websocket._clients.add(MagicMock())
+        try:
+            for i in range(websocket.EVENT_QUEUE_MAXSIZE + 1):
+                websocket.progress_to_ws_callback(
+                    ProgressEvent(EventType.TILE_PROGRESS, {"tiles_done": i})
+                )
+            queue = websocket.get_event_queue()
+            assert queue.qsize() == websocket.EVENT_QUEUE_MAXSIZE
+            assert queue.get_nowait()["tiles_done"] == 1
+        finally:
+            websocket._event_queue = None
+            websocket._clients.clear()
+
+    def test_no_clients_skips_queue(self):
+        from upscaler.api import websocket
+        from upscaler.core.progress import EventType, ProgressEvent
+
+        websocket._event_queue = None
+        try:
+            websocket.progress_to_ws_callback(ProgressEvent(EventType.TILE_PROGRESS))
+            assert websocket.get_event_queue().empty()
+        finally:
+            websocket._event_queue = None
+
+
+class TestWebSocketEndpoint:
+    def test_client_registered_until_disconnect(self, client):
+        from upscaler.api import websocket
+
+        with client.websocket_connect("/ws/progress") as ws:
+            ws.send_text("ping")
+            assert len(websocket._clients) == 1
+        assert len(websocket._clients) == 0
+
+    def test_encode_is_json_bytes(self):
+        import json
+        from upscaler.api.websocket import _encode
+
+        events = [{"type": "tile_progress", "tiles_done": 1}]
+        msg = _encode(events)
+        assert isinstance(msg, bytes)
+        assert json.loads(msg) == events
@@ -0,0 +1,97 @@
+"""Tests for batch processing: image discovery and the run_batch pipeline."""
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import torch
+from PIL import Image
+
+from upscaler.core.batch import find_images, run_batch
+from upscaler.core.upscale_engine import UpscaleEngine
+
+
+class TestFindImages:
+    def _populate(self, root):
+        (root / "b.png").write_bytes(b"")
+        (root / "a.JPG").write_bytes(b"")
+        (root / "notes.txt").write_text("skip me")
+        (root / "folder.png").mkdir()
+        sub = root / "sub"
+        sub.mkdir()
+        (sub / "c.webp").write_bytes(b"")
+
+    def test_top_level_only(self, tmp_path):
+        self._populate(tmp_path)
+        assert find_images(tmp_path) == [tmp_path / "a.JPG", tmp_path / "b.png"]
+
+    def test_recursive(self, tmp_path):
+        self._populate(tmp_path)
+        assert find_images(tmp_path, recursive=True) == [
+            tmp_path / "a.JPG",
+            tmp_path / "b.png",
+            tmp_path / "sub" / "c.webp",
+        ]
+
+    def test_recursive_order_matches_sorted_paths(self, tmp_path):
+        for rel in ("a/z.png", "a-b.png", "a.png", "a/b/c.png", "ab.png", "A.png"):
+            path = tmp_path / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"")
+        found = find_images(tmp_path, recursive=True)
+        assert found == sorted(found)
+        assert len(found) == 6
+
+
+class _StubModel:
+    """Stand-in for a Spandrel model: 2x nearest-neighbour upscale."""
+
+    scale = 2
+
+    def __init__(self):
+        self.model = torch.nn.Conv2d(3, 3, 1)
+
+    def __call__(self, x):
+        return torch.nn.functional.interpolate(x, scale_factor=2, mode="nearest")
+
+
+class TestRunBatch:
+    def test_processes_and_reports_failures(self, tmp_path, sample_image_path):
+        input_dir = tmp_path / "in"
+        input_dir.mkdir()
+        for name in ("a.png", "b.png", "c.png"):
+            (input_dir / name).write_bytes(sample_image_path.read_bytes())
+        (input_dir / "broken.png").write_bytes(b"not an image")
+
+        manager = MagicMock()
+        manager.get_model.return_value = _StubModel()
+        engine = UpscaleEngine(model_manager=manager)
+
+        result = run_batch(
+            engine, input_dir, tmp_path / "out", model_id="stub", scale=2, output_format="png",
+        )
+
+        assert result.total == 4
+        assert result.completed == 3
+        assert result.failed == 1
+        assert "broken.png" in result.errors[0]
+        # Each inference pinned its model for the duration
+        assert manager.pin.call_count == manager.unpin.call_count == 3
+        for out in result.outputs:
+            with Image.open(out) as img:
+                assert img.size == (128, 128)
+
+    def test_outputs_keep_input_order(self, tmp_path, sample_image_path):
+        input_dir = tmp_path / "in"
+        input_dir.mkdir()
+        names = [f"img{i:02d}.png" for i in range(10)]
+        for name in names:
+            (input_dir / name).write_bytes(sample_image_path.read_bytes())
+
+        manager = MagicMock()
+        manager.get_model.return_value = _StubModel()
+        engine = UpscaleEngine(model_manager=manager)
+
+        result = run_batch(engine, input_dir, tmp_path / "out", model_id="stub", scale=2)
+
+        assert result.completed == 10
+        assert [Path(p).name.split("_")[0] for p in result.outputs] == [n[:-4] for n in names]
@@ -0,0 +1,69 @@
+"""Tests for model cache eviction policies."""
+
+from upscaler.core.cache_policy import LRUPolicy, TwoQueuePolicy
+
+
+class TestLRUPolicy:
+    def test_evicts_least_recently_used(self):
+        cache = LRUPolicy()
+        cache["a"] = 1
+        cache["b"] = 2
+        cache.touch("a")
+        assert cache.evict_victim() == ("b", 2)
+        assert list(cache) == ["a"]
+
+    def test_skips_pinned_entries(self):
+        cache = LRUPolicy()
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache.evict_victim(pinned={"a"}) == ("b", 2)
+        assert cache.evict_victim(pinned={"a"}) is None
+
+
+class TestTwoQueuePolicy:
+    def test_one_off_loads_do_not_evict_hot_model(self):
+        cache = TwoQueuePolicy()
+        cache["hot"] = 0
+        cache.touch("hot")  # second use promotes it out of probation
+        for name in ("x", "y", "z"):
+            if len(cache) >= 2:
+                cache.evict_victim()
+            cache[name] = name
+        assert "hot" in cache
+        assert "z" in cache
+
+    def test_falls_back_to_lru_when_probation_empty(self):
+        cache = TwoQueuePolicy()
+        for name in ("a", "b"):
+            cache[name] = name
+            cache.touch(name)
+        cache.touch("a")
+        assert cache.evict_victim() == ("b", "b")
+
+    def test_recently_evicted_model_returns_to_main_queue(self):
+        cache = TwoQueuePolicy()
+        cache["a"] = 1
+        cache.evict_victim()
+        cache["a"] = 1
+        cache["b"] = 2
+        # "a" was seen recently, so "b" (still on probation) goes first
+        assert cache.evict_victim() == ("b", 2)
+
+    def test_skips_pinned_entries(self):
+        cache = TwoQueuePolicy()
+        cache["a"] = 1
+        cache["b"] = 2
+        cache.touch("b")
+        # "a" is on probation but pinned, so the main queue gives up "b"
+        assert cache.evict_victim(pinned={"a"}) == ("b", 2)
+        assert cache.evict_victim(pinned={"a"}) is None
+
+    def test_delete_and_clear(self):
+        cache = TwoQueuePolicy()
+        cache["a"] = 1
+        cache["b"] = 2
+        cache.touch("b")
+        del cache["b"]
+        assert len(cache) == 1
+        cache.clear()
+        assert len(cache) == 0
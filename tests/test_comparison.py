@@ -3,7 +3,11 @@
 import pytest
 from unittest.mock import MagicMock, patch
 
-from upscaler.core.comparison import ComparisonResult, ModelResult
+import torch
+from PIL import Image
+
+from upscaler.core.comparison import ComparisonResult, ComparisonRunner, ModelResult
+from upscaler.core.image_io import load_image_as_tensor
 
 
 class TestComparisonResult:
@@ -32,3 +36,58 @@ class TestComparisonResult:
         )
         assert not result.success
         assert result.error == "Model failed to load"
+
+
+class _StubModel:
+    """Stand-in for a Spandrel model: 2x nearest-neighbour upscale."""
+
+    scale = 2
+
+    def __init__(self):
+        self.model = torch.nn.Conv2d(3, 3, 1)
+
+    def __call__(self, x):
+        return torch.nn.functional.interpolate(x, scale_factor=2, mode="nearest")
+
+
+class TestComparisonRunner:
+    def test_loads_input_once_and_keeps_model_order(self, tmp_path, sample_image_path):
+        def get_model(model_id):
+            if model_id == "bad":
+                raise KeyError(f"Unknown model: {model_id}")
+            return _StubModel()
+
+        manager = MagicMock()
+        manager.get_model.side_effect = get_model
+        runner = ComparisonRunner(model_manager=manager)
+
+        with patch(
+            "upscaler.core.comparison.load_image_as_tensor",
+            wraps=load_image_as_tensor,
+        ) as loader:
+            result = runner.compare(
+                sample_image_path, ["a", "bad", "b"], scale=2,
+                output_dir=tmp_path / "out", output_format="png",
+            )
+
+        assert loader.call_count == 1
+        assert [r.model_id for r in result.results] == ["a", "bad", "b"]
+        assert [r.success for r in result.results] == [True, False, True]
+        for r in (result.results[0], result.results[2]):
+            with Image.open(r.output_path) as img:
+                assert img.size == (128, 128)
+        assert manager.unload_model.call_count == 3
+        # Pins are released even when loading the model fails
+        assert manager.pin.call_count == manager.unpin.call_count == 3
+
+    def test_unreadable_input_fails_every_model(self, tmp_path):
+        bad = tmp_path / "broken.png"
+        bad.write_bytes(b"not an image")
+        manager = MagicMock()
+        runner = ComparisonRunner(model_manager=manager)
+
+        result = runner.compare(bad, ["a", "b"], scale=2, output_dir=tmp_path / "out")
+
+        assert [r.model_id for r in result.results] == ["a", "b"]
+        assert not any(r.success for r in result.results)
+        manager.get_model.assert_not_called()
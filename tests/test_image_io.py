@@ -1,6 +1,10 @@
 """Tests for image I/O module."""
 
+import io
+from pathlib import Path
+
 import pytest
+from unittest.mock import patch
 import torch
 import numpy as np
 from PIL import Image
@@ -9,58 +13,113 @@ from upscaler.core.image_io import (
     load_image_as_tensor,
     save_tensor_as_image,
     get_image_dimensions,
+    generate_thumbnail,
     SUPPORTED_EXTENSIONS,
 )
 
 
+@pytest.fixture(scope="session")
+def load_buffer() -> torch.Tensor:
+    """One (1, 3, 64, 64) output buffer reused by the load tests."""
+    return torch.empty(1, 3, 64, 64)
+
+
 class TestLoadImage:
-    def test_load_rgb(self, sample_image_path):
-        tensor = load_image_as_tensor(sample_image_path)
+    def test_load_rgb(self, sample_image_path, load_buffer):
+        tensor = load_image_as_tensor(sample_image_path, out=load_buffer)
+        assert tensor is load_buffer
         assert tensor.shape == (1, 3, 64, 64)
         assert tensor.dtype == torch.float32
         assert tensor.min() >= 0.0
         assert tensor.max() <= 1.0
 
-    def test_load_rgba_strips_alpha(self, sample_rgba_image_path):
-        tensor = load_image_as_tensor(sample_rgba_image_path)
+    def test_load_matches_uint8_over_255(self, sample_image_path, load_buffer):
+        expected = np.array(Image.open(sample_image_path)).astype(np.float32) / 255.0
+        expected = torch.from_numpy(expected)
+        tensor = load_image_as_tensor(sample_image_path)
+        assert tensor.is_contiguous()
+        assert torch.equal(tensor[0].permute(1, 2, 0), expected)
+        # Writing into a buffer gives the same values
+        load_image_as_tensor(sample_image_path, out=load_buffer)
+        assert torch.equal(load_buffer[0].permute(1, 2, 0), expected)
+
+    def test_load_into_wrong_shape_raises(self, sample_image_path):
+        with pytest.raises(ValueError, match="shape"):
+            load_image_as_tensor(sample_image_path, out=torch.empty(1, 3, 32, 32))
+
+    def test_load_rgba_strips_alpha(self, sample_rgba_image_path, load_buffer):
+        tensor = load_image_as_tensor(sample_rgba_image_path, out=load_buffer)
         assert tensor.shape[1] == 3  # Alpha stripped
 
-    def test_load_unsupported_format(self, tmp_path):
-        bad_file = tmp_path / "test.xyz"
-        bad_file.write_text("not an image")
-        with pytest.raises(ValueError, match="Unsupported"):
-            load_image_as_tensor(bad_file)
+    def test_load_closes_file(self, sample_image_path):
+        opened = []
+        real_open = Image.open
 
+        def open_and_track(*args, **kwargs):
+            opened.append(real_open(*args, **kwargs))
+            return opened[-1]
 
-class TestSaveImage:
-    def test_save_png(self, tmp_path, sample_tensor):
-        out = tmp_path / "out.png"
-        save_tensor_as_image(sample_tensor, out, format="png")
-        assert out.exists()
-        img = Image.open(out)
-        assert img.size == (64, 64)
+        with patch("upscaler.core.image_io.Image.open", side_effect=open_and_track):
+            load_image_as_tensor(sample_image_path)
+        assert opened[0].fp is None
 
-    def test_save_jpg(self, tmp_path, sample_tensor):
-        out = tmp_path / "out.jpg"
-        save_tensor_as_image(sample_tensor, out, format="jpg", jpeg_quality=85)
-        assert out.exists()
+    def test_load_unsupported_format(self):
+        # Rejected by extension before the file is opened, so it needn't exist
+        with pytest.raises(ValueError, match="Unsupported"):
+            load_image_as_tensor(Path("nonexistent.xyz"))
 
-    def test_save_webp(self, tmp_path, sample_tensor):
-        out = tmp_path / "out.webp"
-        save_tensor_as_image(sample_tensor, out, format="webp")
-        assert out.exists()
+
+class TestSaveImage:
+    @pytest.mark.parametrize("fmt,kw,pil_format", [
+        ("png", {}, "PNG"),
+        ("jpg", {"jpeg_quality": 85}, "JPEG"),
+        ("webp", {}, "WEBP"),
+    ])
+    def test_save_format(self, sample_tensor, fmt, kw, pil_format):
+        buf = io.BytesIO()
+        assert save_tensor_as_image(sample_tensor, buf, format=fmt, **kw) is buf
+        buf.seek(0)
+        with Image.open(buf) as img:
+            assert img.format == pil_format
+            assert img.size == (64, 64)
 
     def test_save_creates_dirs(self, tmp_path, sample_tensor):
         out = tmp_path / "a" / "b" / "out.png"
         save_tensor_as_image(sample_tensor, out)
         assert out.exists()
 
-    def test_roundtrip(self, tmp_path, sample_image_path):
+    def test_save_does_not_modify_input(self, tmp_path):
+        tensor = torch.rand(1, 3, 16, 16) * 2 - 0.5
+        original = tensor.clone()
+        save_tensor_as_image(tensor, tmp_path / "out.png")
+        assert torch.equal(tensor, original)
+
+    def test_save_half_precision(self, tmp_path):
+        tensor = torch.rand(1, 3, 32, 32)
+        save_tensor_as_image(tensor, tmp_path / "f32.png")
+        save_tensor_as_image(tensor.half(), tmp_path / "f16.png")
+        with Image.open(tmp_path / "f32.png") as a, Image.open(tmp_path / "f16.png") as b:
+            diff = np.abs(np.asarray(a, dtype=np.int16) - np.asarray(b, dtype=np.int16))
+        assert diff.max() <= 1
+
+    def test_roundtrip(self, sample_image_path):
         tensor = load_image_as_tensor(sample_image_path)
-        out = tmp_path / "roundtrip.png"
-        save_tensor_as_image(tensor, out)
-        tensor2 = load_image_as_tensor(out)
-        assert torch.allclose(tensor, tensor2, atol=1 / 255 + 0.01)
+        buf = io.BytesIO()
+        save_tensor_as_image(tensor, buf)
+        buf.seek(0)
+        tensor2 = load_image_as_tensor(buf)
+        assert (tensor - tensor2).abs_().max().item() <= 1 / 255 + 0.01
+
+
+    def test_numba_quantize_matches_torch(self):
+        from upscaler.core import image_io
+        if image_io._f32_to_u8_hwc is None:
+            pytest.skip("numba not installed")
+        src = torch.rand(3, 20, 30) * 1.4 - 0.2
+        expected = src.clamp(0, 1).mul(255).round().to(torch.uint8).permute(1, 2, 0).numpy()
+        out = np.empty((20, 30, 3), dtype=np.uint8)
+        image_io._f32_to_u8_hwc(src.numpy(), out)
+        assert np.array_equal(out, expected)
 
 
 class TestGetDimensions:
@@ -68,3 +127,12 @@ class TestGetDimensions:
         w, h = get_image_dimensions(sample_image_path)
         assert w == 64
         assert h == 64
+
+
+class TestThumbnail:
+    def test_large_jpeg_thumbnail(self, tmp_path):
+        path = tmp_path / "big.jpg"
+        Image.fromarray(np.zeros((1200, 800, 3), dtype=np.uint8)).save(path)
+        thumb = generate_thumbnail(path, max_size=256)
+        assert thumb.mode == "RGB"
+        assert thumb.size == (171, 256)
@@ -1,13 +1,24 @@
 """Tests for model manager: scanning, LRU cache, metadata."""
 
 import json
+import os
+import weakref
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 
 from upscaler.core.model_manager import ModelManager, ModelInfo
 
+# Shared registry entry for tests that only read it
+_TEST_MODEL = ModelInfo(
+    model_id="test",
+    filename="test.pth",
+    path="/fake/test.pth",
+    architecture="ESRGAN",
+    scale=4,
+)
+
 
 class TestModelManagerScan:
     def test_scan_empty_dir(self, models_dir):
@@ -15,7 +26,8 @@ class TestModelManagerScan:
         models = manager.scan()
         assert models == []
 
-    def test_scan_finds_pth_files(self, models_dir):
+    def test_scan_finds_pth_files(self, fake_models_dir):
+        models_dir = fake_models_dir
         # Create fake model files
         (models_dir / "model_a.pth").write_bytes(b"fake")
         (models_dir / "model_b.safetensors").write_bytes(b"fake")
@@ -30,7 +42,8 @@ class TestModelManagerScan:
         assert "model_b" in ids
         assert len(models) == 2
 
-    def test_metadata_cache_roundtrip(self, models_dir):
+    def test_metadata_cache_roundtrip(self, fake_models_dir):
+        models_dir = fake_models_dir
         (models_dir / "test.pth").write_bytes(b"fake")
 
         with patch.object(ModelManager, '_probe_model'):
@@ -42,20 +55,76 @@ class TestModelManagerScan:
         assert cache_path.exists()
 
         data = json.loads(cache_path.read_text())
-        assert "test" in data
+        assert data["version"] == 1
+        assert "test" in data["entries"]
+        assert data["entries"]["test"]["size"] == 4
+
+    def test_unversioned_metadata_cache_is_ignored(self, models_dir):
+        (models_dir / "test.pth").write_bytes(b"fake")
+        (models_dir / ".model_cache.json").write_text(json.dumps({
+            "test": {"model_id": "test", "filename": "test.pth", "path": "x", "scale": 99},
+        }))
+
+        with patch.object(ModelManager, '_probe_model'):
+            (info,) = ModelManager(models_dir=models_dir, max_loaded=3).scan()
+        assert info.scale == 0
+
+    def test_known_model_skips_probe(self, models_dir):
+        (models_dir / "RealESRGAN_x2plus.pth").write_bytes(b"fake")
+
+        with patch.object(ModelManager, '_probe_model') as probe:
+            manager = ModelManager(models_dir=models_dir, max_loaded=3)
+            (info,) = manager.scan()
+
+        probe.assert_not_called()
+        assert info.scale == 2
+
+    def test_metadata_cache_invalidated_by_file_change(self, models_dir):
+        model_file = models_dir / "test.pth"
+        model_file.write_bytes(b"fake")
+
+        def probe(self, info, path):
+            info.scale = len(path.read_bytes())
+
+        with patch.object(ModelManager, '_probe_model', probe):
+            ModelManager(models_dir=models_dir, max_loaded=3).scan()
+            assert ModelManager(models_dir=models_dir, max_loaded=3).scan()[0].scale == 4
+
+            model_file.write_bytes(b"replaced")
+            assert ModelManager(models_dir=models_dir, max_loaded=3).scan()[0].scale == 8
+
+    def test_scan_skipped_until_directory_changes(self, models_dir):
+        (models_dir / "model_a.pth").write_bytes(b"fake")
+
+        with patch.object(ModelManager, '_probe_model'):
+            manager = ModelManager(models_dir=models_dir, max_loaded=3)
+            manager.scan()
+            os.utime(models_dir, ns=(1, 1))  # settled mtime, as if long unchanged
+            manager.scan()
+
+            with patch.object(ModelManager, '_build_info') as build:
+                assert [m.model_id for m in manager.scan()] == ["model_a"]
+            build.assert_not_called()
+
+            (models_dir / "model_b.pth").write_bytes(b"fake")
+            assert {m.model_id for m in manager.scan()} == {"model_a", "model_b"}
+
+    def test_find_model_info_without_scan(self, models_dir):
+        (models_dir / "model_a.pth").write_bytes(b"fake")
+        (models_dir / "model_b.safetensors").write_bytes(b"fake")
+
+        with patch.object(ModelManager, '_probe_model'):
+            manager = ModelManager(models_dir=models_dir, max_loaded=3)
+            info = manager.find_model_info("model_b")
+
+        assert info.filename == "model_b.safetensors"
+        assert [m.model_id for m in manager.list_models()] == ["model_b"]
+        assert manager.find_model_info("missing") is None
 
     def test_list_models(self, models_dir):
         manager = ModelManager(models_dir=models_dir, max_loaded=3)
-        manager._registry["test"] = ModelInfo(
-            model_id="test",
-            filename="test.pth",
-            path=str(models_dir / "test.pth"),
-            architecture="ESRGAN",
-            scale=4,
-        )
-        models = manager.list_models()
-        assert len(models) == 1
-        assert models[0].model_id == "test"
+        manager._registry["test"] = _TEST_MODEL
+        assert manager.list_models() == [_TEST_MODEL]
 
 
 class TestModelManagerLRU:
@@ -72,17 +141,55 @@ class TestModelManagerLRU:
         manager = ModelManager(models_dir=models_dir, max_loaded=2)
 
         # Manually place items in the loaded cache
-        manager._loaded["a"] = MagicMock()
-        manager._loaded["b"] = MagicMock()
+        manager._loaded["a"] = object()
+        manager._loaded["b"] = object()
 
         # Evict check
         manager._evict_if_needed()
         assert "a" not in manager._loaded
         assert "b" in manager._loaded
 
+    def test_eviction_on_low_vram(self, models_dir):
+        manager = ModelManager(models_dir=models_dir, max_loaded=3, memory_free_threshold=0.25)
+        live = weakref.WeakSet()
+
+        class FakeModel:
+            """Holds 4 of 10 memory units for as long as anything references it."""
+
+            def __init__(self):
+                live.add(self)
+
+        def mem_get_info():
+            return 10 - 4 * len(live), 10
+
+        manager._loaded["a"] = FakeModel()
+        manager._loaded["b"] = FakeModel()
+
+        # 20% free with both loaded; evicting one must really free it (60% free)
+        with patch("torch.cuda.is_available", return_value=True), \
+                patch("torch.cuda.mem_get_info", side_effect=mem_get_info), \
+                patch("torch.cuda.empty_cache"):
+            manager._evict_if_needed()
+        assert manager.loaded_model_ids() == ["b"]
+
+    def test_pinned_model_not_evicted(self, models_dir):
+        manager = ModelManager(models_dir=models_dir, max_loaded=1)
+        manager._loaded["a"] = object()
+        manager._loaded["b"] = object()
+        manager.pin("a")
+        manager.pin("a")
+        manager.unpin("a")  # still held by the outer pin
+        with patch("torch.cuda.empty_cache"):
+            # Only the pinned model is left: it stays even though that's over the limit
+            manager._evict_if_needed()
+            assert manager.loaded_model_ids() == ["a"]
+            manager.unpin("a")
+            manager._evict_if_needed()
+        assert manager.loaded_model_ids() == []
+
     def test_unload_model(self, models_dir):
         manager = ModelManager(models_dir=models_dir, max_loaded=3)
-        manager._loaded["test"] = MagicMock()
+        manager._loaded["test"] = object()
         assert manager.is_loaded("test")
 
         manager.unload_model("test")
@@ -90,7 +197,7 @@ class TestModelManagerLRU:
 
     def test_unload_all(self, models_dir):
         manager = ModelManager(models_dir=models_dir, max_loaded=3)
-        manager._loaded["a"] = MagicMock()
-        manager._loaded["b"] = MagicMock()
+        manager._loaded["a"] = object()
+        manager._loaded["b"] = object()
         manager.unload_all()
         assert len(manager.loaded_model_ids()) == 0
@@ -0,0 +1,74 @@
+"""Tests for model registry downloads."""
+
+import os
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from upscaler.core import model_registry
+from upscaler.core.model_registry import download_model, list_not_downloaded
+from upscaler.core.progress import ProgressReporter
+
+PAYLOAD = os.urandom(100_000)
+
+
+def _serve(support_ranges: bool):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        range_header = request.headers.get("range")
+        if support_ranges and range_header:
+            start, end = map(int, range_header.removeprefix("bytes=").split("-"))
+            return httpx.Response(
+                206,
+                content=PAYLOAD[start:end + 1],
+                headers={"content-range": f"bytes {start}-{end}/{len(PAYLOAD)}"},
+            )
+        return httpx.Response(200, content=PAYLOAD)
+
+    real_client = httpx.Client
+
+    def client(**kwargs):
+        return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    return requests, client
+
+
+class TestDownloadModel:
+    @pytest.mark.parametrize("support_ranges", [True, False])
+    def test_download(self, tmp_path, support_ranges):
+        requests, client = _serve(support_ranges)
+        with patch.object(model_registry, "DOWNLOAD_SEGMENT_MIN", 10_000), \
+                patch("httpx.Client", side_effect=client):
+            dest = download_model("RealESRGAN_x2plus", models_dir=tmp_path)
+
+        assert dest.read_bytes() == PAYLOAD
+        assert not list(tmp_path.glob("*.part"))
+        # probe + one request per segment, or probe + a single full GET
+        assert len(requests) == (1 + 8 if support_ranges else 2)
+
+    def test_progress_is_throttled_with_final_event(self, tmp_path):
+        _, client = _serve(support_ranges=False)
+        reporter = ProgressReporter()
+        events = []
+        reporter.add_callback(events.append)
+        with patch.object(model_registry, "DOWNLOAD_CHUNK_SIZE", 1000), \
+                patch("httpx.Client", side_effect=client):
+            download_model("RealESRGAN_x2plus", models_dir=tmp_path, progress=reporter)
+
+        assert len(events) < len(PAYLOAD) // 1000
+        assert events[-1].data["downloaded"] == len(PAYLOAD)
+
+
+class TestListNotDownloaded:
+    def test_tracks_directory_changes(self, tmp_path):
+        assert len(list_not_downloaded(tmp_path)) == len(model_registry.KNOWN_MODELS)
+        os.utime(tmp_path, ns=(1, 1))
+        list_not_downloaded(tmp_path)
+
+        (tmp_path / "RealESRGAN_x2plus.pth").write_bytes(b"fake")
+        keys = {e.key for e in list_not_downloaded(tmp_path)}
+        assert "RealESRGAN_x2plus" not in keys
+        assert len(keys) == len(model_registry.KNOWN_MODELS) - 1
@@ -1,29 +1,55 @@
 """Tests for upscale engine: chaining logic, output dimensions."""
 
 import pytest
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
 
-from upscaler.core.upscale_engine import _compute_passes, _lanczos_resize, _format_to_ext
+from PIL import Image
+
+from upscaler.core.config import Settings, settings
+from upscaler.core.upscale_engine import (
+    UpscaleEngine,
+    _compute_passes,
+    _format_to_ext,
+    _lanczos_resize,
+    _lanczos_resize_torch,
+    inference_autocast,
+)
 import torch
 
 
 class TestComputePasses:
-    def test_native_scale(self):
-        assert _compute_passes(4, 4) == 1
+    @pytest.mark.parametrize("target,native,expected", [
+        (4, 4, 1),   # native scale
+        (2, 4, 1),   # target less than native
+        (8, 4, 2),   # 4^2 = 16 >= 8
+        (8, 2, 3),   # 2^3 = 8
+        (32, 4, 3),  # 4^3 = 64 >= 32
+    ])
+    def test_compute_passes(self, target, native, expected):
+        assert _compute_passes(target, native) == expected
 
-    def test_target_less_than_native(self):
-        assert _compute_passes(2, 4) == 1
 
-    def test_8x_from_4x_model(self):
-        # 4^2 = 16, need 2 passes
-        assert _compute_passes(8, 4) == 2
+class TestInferenceAutocast:
+    @pytest.mark.parametrize("half_dtype,expected", [
+        ("float16", torch.float16),
+        ("bfloat16", torch.bfloat16),
+    ])
+    def test_cuda_uses_configured_half_dtype(self, monkeypatch, half_dtype, expected):
+        monkeypatch.setattr(settings, "fp16", True)
+        monkeypatch.setattr(settings, "half_dtype", half_dtype)
+        with patch("torch.autocast") as autocast:
+            inference_autocast(torch.device("cuda"))
+        autocast.assert_called_once_with(device_type="cuda", dtype=expected, enabled=True)
 
-    def test_8x_from_2x_model(self):
-        # 2^3 = 8, need 3 passes
-        assert _compute_passes(8, 2) == 3
+    def test_default_half_dtype_is_float16(self):
+        assert Settings().half_dtype == "float16"
 
-    def test_large_target(self):
-        # 4^3 = 64, 3 passes needed for 32x
-        assert _compute_passes(32, 4) == 3
+    def test_disabled_on_cpu(self):
+        with inference_autocast(torch.device("cpu")):
+            assert not torch.is_autocast_enabled("cpu")
+            out = torch.nn.Linear(4, 4)(torch.rand(1, 4))
+        assert out.dtype == torch.float32
 
 
 class TestLanczosResize:
@@ -39,16 +65,75 @@ class TestLanczosResize:
         assert result.max() <= 1.0
 
 
+    def test_torch_resize_matches_pil(self):
+        tensor = torch.nn.functional.avg_pool2d(torch.rand(1, 3, 120, 90), 5, 1, 2)
+        expected = _lanczos_resize(tensor, 45, 60)
+        result = _lanczos_resize_torch(tensor, 45, 60)
+        assert result.shape == (1, 3, 60, 45)
+        # PIL path quantizes to uint8 on the way in and out
+        assert (result - expected).abs().max() < 2 / 255
+
+
 class TestFormatToExt:
-    def test_common_formats(self):
-        assert _format_to_ext("png") == ".png"
-        assert _format_to_ext("jpg") == ".jpg"
-        assert _format_to_ext("jpeg") == ".jpg"
-        assert _format_to_ext("webp") == ".webp"
-
-    def test_case_insensitive(self):
-        assert _format_to_ext("PNG") == ".png"
-        assert _format_to_ext("Jpg") == ".jpg"
-
-    def test_unknown_defaults_to_png(self):
-        assert _format_to_ext("bla") == ".png"
+    @pytest.mark.parametrize("fmt,ext", [
+        ("png", ".png"),
+        ("jpg", ".jpg"),
+        ("jpeg", ".jpg"),
+        ("webp", ".webp"),
+        ("PNG", ".png"),   # case-insensitive
+        ("Jpg", ".jpg"),
+        ("bla", ".png"),   # unknown defaults to png
+    ])
+    def test_format_to_ext(self, fmt, ext):
+        assert _format_to_ext(fmt) == ext
+
+
+class _StubModel:
+    """Stand-in for a Spandrel model: 2x nearest-neighbour upscale."""
+
+    scale = 2
+
+    def __init__(self):
+        self.model = torch.nn.Conv2d(3, 3, 1)
+
+    def __call__(self, x):
+        return torch.nn.functional.interpolate(x, scale_factor=2, mode="nearest")
+
+
+@pytest.fixture
+def area_resize(monkeypatch):
+    """Stand in area interpolation for the overshoot Lanczos where only the output size matters."""
+    monkeypatch.setattr(
+        "upscaler.core.upscale_engine._lanczos_resize",
+        lambda t, w, h: torch.nn.functional.interpolate(t, (h, w), mode="area"),
+    )
+
+
+class TestUpscale:
+    def test_overshoot_resized_to_target(self, tmp_path, sample_image_path, area_resize):
+        manager = MagicMock()
+        manager.get_model.return_value = _StubModel()
+        engine = UpscaleEngine(model_manager=manager)
+
+        # Two 2x passes give 4x, then the result is resized down to 3x
+        out_path = engine.upscale(sample_image_path, tmp_path / "out.png", model_id="stub", scale=3)
+        with Image.open(out_path) as img:
+            assert img.size == (192, 192)
+        manager.pin.assert_called_once_with("stub")
+        manager.unpin.assert_called_once_with("stub")
+
+    def test_save_executor_returns_future(self, tmp_path, sample_image_path):
+        manager = MagicMock()
+        manager.get_model.return_value = _StubModel()
+        engine = UpscaleEngine(model_manager=manager)
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            saved = engine.upscale(
+                sample_image_path, tmp_path / "out.png", model_id="stub", scale=2,
+                save_executor=pool,
+            )
+            assert isinstance(saved, Future)
+            out_path = saved.result()
+
+        with Image.open(out_path) as img:
+            assert img.size == (128, 128)